@@ -0,0 +1,154 @@
+"""
+Test the shared worktree snapshot (_gwt-snapshot) and the cached name index
+(_gwt-index) in git-worktree.zsh.
+
+Runs zsh non-interactively against a real repo with worktrees that are
+ahead, behind, diverged and detached relative to the main checkout.
+"""
+
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+WORKTREE_ZSH = Path(__file__).parent.parent / "git-worktree.zsh"
+
+
+def git(cwd: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def commit(cwd: Path, name: str) -> None:
+    (cwd / name).write_text(f"{name}\n")
+    git(cwd, "add", name)
+    git(cwd, "commit", "-m", name)
+
+
+def create_repo(base: Path) -> Path:
+    """main-repo with ahead/behind/diverged branches and a detached worktree."""
+    repo = base / "main-repo"
+    repo.mkdir()
+    git(repo, "init", "-b", "main")
+    git(repo, "config", "user.email", "test@test.com")
+    git(repo, "config", "user.name", "Test")
+    commit(repo, "README.md")
+
+    git(repo, "worktree", "add", "-b", "wt-behind", str(base / "wt-behind"))
+    git(repo, "worktree", "add", "-b", "wt-diverged", str(base / "wt-diverged"))
+    commit(repo, "main.txt")
+    git(repo, "worktree", "add", "-b", "wt-ahead", str(base / "wt-ahead"))
+    commit(base / "wt-ahead", "ahead1.txt")
+    commit(base / "wt-ahead", "ahead2.txt")
+    commit(base / "wt-diverged", "diverged.txt")
+    git(repo, "worktree", "add", "--detach", str(base / "wt-detached"), "HEAD")
+    return repo
+
+
+def snapshot(repo: Path, *opts: str) -> dict:
+    """Run _gwt-snapshot in repo; returns {worktree name: (branch, detached, ahead, behind)}."""
+    script = (
+        f"source {WORKTREE_ZSH}; _gwt-snapshot {' '.join(opts)} || exit 1; "
+        'print -r -- "base ${_gwt_snap_base_branch} ${_gwt_snap_toplevel:t}"; '
+        "for (( i=1; i<=${#_gwt_snap_path}; i++ )); do "
+        'print -r -- "${_gwt_snap_path[$i]:t} ${_gwt_snap_branch[$i]} ${_gwt_snap_detached[$i]} '
+        '${_gwt_snap_ahead[$i]:--} ${_gwt_snap_behind[$i]:--}"; done'
+    )
+    result = subprocess.run(["zsh", "-f", "-c", script], cwd=repo, capture_output=True, text=True, check=True)
+    rows = {}
+    for line in result.stdout.splitlines():
+        fields = line.split()
+        rows[fields[0]] = tuple(fields[1:])
+    return rows
+
+
+def test_snapshot_counts():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = create_repo(Path(tmpdir))
+        rows = snapshot(repo)
+
+        assert rows["base"] == ("main", "main-repo")
+        assert rows["main-repo"] == ("main", "0", "0", "0")
+        assert rows["wt-ahead"] == ("wt-ahead", "0", "2", "0")
+        assert rows["wt-behind"] == ("wt-behind", "0", "0", "1")
+        assert rows["wt-diverged"] == ("wt-diverged", "0", "1", "1")
+        assert rows["wt-detached"] == ("HEAD", "1", "0", "0")
+
+
+def test_snapshot_no_counts_and_only():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        repo = create_repo(base)
+
+        rows = snapshot(repo, "--no-counts")
+        assert rows["wt-ahead"] == ("wt-ahead", "0", "-", "-")
+
+        rows = snapshot(repo, "--only", str((base / "wt-diverged").resolve()))
+        assert rows["wt-diverged"][2:] == ("1", "1")
+        assert rows["wt-ahead"][2:] == ("-", "-")
+
+
+def test_snapshot_leaves_no_helper_functions():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = create_repo(Path(tmpdir))
+        for jobs in ("1", "4"):
+            # No %(ahead-behind) here, so every count goes through the fallback helper
+            script = (
+                f"source {WORKTREE_ZSH}; "
+                "git() { [[ $1 == for-each-ref ]] && return 1; command git \"$@\" }; "
+                f"_gwt-snapshot --jobs {jobs} || exit 1; "
+                'print -r -- "${+functions[_gwt-snapshot-count]}"'
+            )
+            result = subprocess.run(["zsh", "-f", "-c", script], cwd=repo, capture_output=True, text=True, check=True)
+            assert result.stdout.strip() == "0"
+
+
+def test_snapshot_outside_repo_fails():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = subprocess.run(
+            ["zsh", "-f", "-c", f"source {WORKTREE_ZSH}; _gwt-snapshot"],
+            cwd=tmpdir, capture_output=True, text=True,
+        )
+        assert result.returncode == 1
+
+
+def test_name_index_cached_until_worktrees_change():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        repo = create_repo(base)
+        time.sleep(1.1)  # let the admin files' mtimes settle into the past
+
+        script = (
+            f"source {WORKTREE_ZSH}; "
+            '_gwt-list-names; print -r -- "names ${(j:,:)${(o)reply}}"; '
+            # A cache hit must not run git at all
+            'git() { print -r -- "git called" >&2; return 1 }; '
+            '_gwt-find-dir wt-ahead && print -r -- "dir ${REPLY:t}"; '
+            '_gwt-find-dir wt-diverged && print -r -- "dir ${REPLY:t}"; '
+            "unfunction git; "
+            f"git worktree add -q -b wt-new {base / 'wt-new'} && sleep 1.1; "
+            '_gwt-list-names; print -r -- "names ${(j:,:)${(o)reply}}"'
+        )
+        result = subprocess.run(["zsh", "-f", "-c", script], cwd=repo, capture_output=True, text=True)
+
+        assert "git called" not in result.stderr
+        lines = result.stdout.splitlines()
+        assert lines[0] == "names main-repo,wt-ahead,wt-behind,wt-detached,wt-diverged"
+        assert lines[1:3] == ["dir wt-ahead", "dir wt-diverged"]
+        assert lines[3] == "names main-repo,wt-ahead,wt-behind,wt-detached,wt-diverged,wt-new"
+
+
+def test_name_index_follows_worktree_move():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        repo = create_repo(base)
+        time.sleep(1.1)
+
+        script = (
+            f"source {WORKTREE_ZSH}; "
+            '_gwt-find-dir wt-ahead && print -r -- "dir ${REPLY:t}"; '
+            f"git worktree move {base / 'wt-ahead'} {base / 'wt-moved'}; "
+            '_gwt-find-dir wt-ahead && print -r -- "dir ${REPLY:t}"'
+        )
+        result = subprocess.run(["zsh", "-f", "-c", script], cwd=repo, capture_output=True, text=True)
+
+        assert result.stdout.splitlines() == ["dir wt-ahead", "dir wt-moved"]
@@ -0,0 +1,228 @@
+"""
+Test the gwt-sync-all / gwt-analyze machinery in git-worktree.zsh.
+
+Runs zsh non-interactively against real repos. The rad-* output helpers
+normally come from rad-shell, so the harness defines plain versions.
+"""
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+
+WORKTREE_ZSH = Path(__file__).parent.parent / "git-worktree.zsh"
+RAD_HELPERS = 'rad-red() { print -r -- "$*" }; rad-green() { print -r -- "$*" }; rad-yellow() { print -r -- "$*" }'
+
+
+def git(cwd: Path, *args: str) -> str:
+    return subprocess.run(["git", *args], cwd=cwd, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def write_commit(cwd: Path, name: str, content: str) -> None:
+    path = cwd / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    git(cwd, "add", name)
+    git(cwd, "commit", "-m", f"edit {name}")
+
+
+def run_gwt(repo: Path, script: str, **env: str) -> subprocess.CompletedProcess:
+    full = f"source {WORKTREE_ZSH}; {RAD_HELPERS}; {script}"
+    return subprocess.run(["zsh", "-f", "-c", full], cwd=repo, capture_output=True, text=True,
+                          env={**os.environ, **env})
+
+
+def create_conflict_repo(base: Path) -> Path:
+    """main-repo plus clean, planning-only and complex worktrees."""
+    repo = base / "main-repo"
+    repo.mkdir()
+    git(repo, "init", "-b", "main")
+    git(repo, "config", "user.email", "test@test.com")
+    git(repo, "config", "user.name", "Test")
+    write_commit(repo, "README.md", "base\n")
+    write_commit(repo, ".agent_planning/PLAN.md", "plan\n")
+
+    for name in ("wt-clean", "wt-auto", "wt-complex"):
+        git(repo, "worktree", "add", "-b", name, str(base / name))
+    write_commit(base / "wt-clean", "feature.txt", "new\n")
+    write_commit(base / "wt-auto", ".agent_planning/PLAN.md", "branch plan\n")
+    write_commit(base / "wt-complex", "README.md", "branch readme\n")
+    write_commit(base / "wt-complex", ".agent_planning/PLAN.md", "branch plan\n")
+
+    write_commit(repo, "README.md", "main readme\n")
+    write_commit(repo, ".agent_planning/PLAN.md", "main plan\n")
+    return repo
+
+
+def test_analyze_branches_categories():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = create_conflict_repo(Path(tmpdir))
+        worktrees_before = git(repo, "worktree", "list", "--porcelain")
+
+        result = run_gwt(repo, (
+            "_gwt-analyze-branches main wt-clean wt-auto wt-complex || exit 1; "
+            r'for (( i=1; i<=3; i++ )); do print -r -- "${_gwt_analysis_category[$i]}|${(j:,:)${(f)_gwt_analysis_files[$i]}}"; done'
+        ), GWT_ANALYZE_JOBS="2")
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == [
+            "clean|",
+            "auto|.agent_planning/PLAN.md",
+            "complex|.agent_planning/PLAN.md,README.md",
+        ]
+        # No temp worktree was created, and no checkout was touched
+        assert git(repo, "worktree", "list", "--porcelain") == worktrees_before
+        assert git(repo, "status", "--porcelain") == ""
+
+
+def test_gwt_analyze_report():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = create_conflict_repo(Path(tmpdir))
+
+        result = run_gwt(repo, "gwt-analyze")
+
+        assert result.returncode == 0, result.stderr
+        assert "wt-auto" in result.stdout.split("AUTO-RESOLVABLE")[1]
+        assert "README.md" in result.stdout.split("COMPLEX")[1]
+        assert "Clean:    1" in result.stdout
+        assert "Auto:     1" in result.stdout
+        assert "Complex:  1" in result.stdout
+
+
+def test_analysis_cache_reused_and_pruned():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = create_conflict_repo(Path(tmpdir))
+        cache_dir = repo / ".git" / "gwt-analysis"
+        script = (
+            "_gwt-analyze-branches main wt-clean wt-complex || exit 1; "
+            r'print -rl -- "${_gwt_analysis_category[@]}"'
+        )
+
+        first = run_gwt(repo, script)
+        assert first.stdout.splitlines() == ["clean", "complex"]
+        entries = sorted(p.name for p in cache_dir.iterdir())
+        assert len(entries) == 2
+
+        # A cached result is served as-is, without re-running the merge
+        main_sha = git(repo, "rev-parse", "main")
+        clean_sha = git(repo, "rev-parse", "wt-clean")
+        (cache_dir / f"{main_sha}-{clean_sha}").write_text("auto\nfrom-cache.md\n")
+        second = run_gwt(repo, script)
+        assert second.stdout.splitlines() == ["auto", "complex"]
+
+        # Entries naming a commit that no longer exists are evicted
+        stale = cache_dir / f"{main_sha}-{'0' * 40}"
+        stale.write_text("clean\n")
+        run_gwt(repo, script)
+        assert not stale.exists()
+        assert (cache_dir / f"{main_sha}-{clean_sha}").exists()
+
+
+def test_wave_plan_isolates_shared_branch():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        repo = Path(tmpdir) / "main-repo"
+        repo.mkdir()
+        git(repo, "init", "-b", "main")
+        git(repo, "config", "user.email", "test@test.com")
+        git(repo, "config", "user.name", "Test")
+        write_commit(repo, "README.md", "base\n")
+
+        # hub shares one file with each of a, b and c; solo shares nothing
+        touched = {"hub": ["f1", "f2", "f3"], "a": ["f1"], "b": ["f2"], "c": ["f3"], "solo": ["g"]}
+        for branch, files in touched.items():
+            git(repo, "checkout", "-q", "-b", branch, "main")
+            for name in files:
+                write_commit(repo, name, f"{branch}\n")
+        git(repo, "checkout", "-q", "main")
+
+        result = run_gwt(repo, (
+            "_gwt-plan-waves main hub a b c solo; "
+            r'for k in $_gwt_wave_order; do print -r -- "$k ${_gwt_wave_num[$k]} ${_gwt_wave_cost[$k]}"; done; '
+            "_gwt-print-wave-plan hub a b c solo"
+        ))
+
+        assert result.returncode == 0, result.stderr
+        lines = result.stdout.splitlines()
+        # solo (no overlaps) first, then a, b, c; hub alone in wave 2 with cost 3
+        assert lines[:5] == ["5 1 0", "2 1 0", "3 1 0", "4 1 0", "1 2 3"]
+        assert "  Wave 1: solo, a, b, c" in lines
+        assert "  Wave 2: hub" in lines
+        assert "  Predicted conflict cost: 3 shared file(s)" in lines
+
+
+def test_parallel_pool_keeps_argument_order():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = run_gwt(Path(tmpdir), (
+            # Later arguments finish first; output and status still follow argument order
+            'job() { sleep 0.$(( 4 - $1 )); echo "out $1"; echo "err $1" >&2; return $1 }; '
+            "_gwt-parallel 2 job 1 2 3; "
+            'for (( k=1; k<=3; k++ )); do print -r -- "${_gwt_par_status[$k]}|${(j:;:)${(f)_gwt_par_output[$k]}}"; done'
+        ))
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.splitlines() == ["1|out 1;err 1", "2|out 2;err 2", "3|out 3;err 3"]
+
+
+def test_wip_message_from_single_status():
+    porcelain = " M a.txt\\n?? b.txt\\nA  c.txt\\n M d\\n M e\\n M f"
+    with tempfile.TemporaryDirectory() as tmpdir:
+        result = run_gwt(Path(tmpdir), f"_gwt-wip-message $'{porcelain}'; print -r -- \"[$REPLY]\"")
+
+        assert result.stdout.strip() == "[WIP: a.txt b.txt c.txt d e ]"
+
+
+def test_undo_generations_restore_and_retention():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        repo = create_conflict_repo(base)
+        clean_before = git(repo, "rev-parse", "wt-clean")
+
+        for _ in range(3):
+            saved = run_gwt(repo, "_gwt-save-state", GWT_UNDO_KEEP="2")
+            assert saved.returncode == 0, saved.stderr
+        gens = git(repo, "for-each-ref", "--format=%(refname)", "refs/gwt-sync/*/manifest").splitlines()
+        assert gens == ["refs/gwt-sync/2/manifest", "refs/gwt-sync/3/manifest"]
+
+        # Move one worktree, then undo the newest generation
+        write_commit(base / "wt-clean", "later.txt", "later\n")
+        result = run_gwt(repo, "gwt-undo-sync")
+
+        assert result.returncode == 0, result.stderr
+        assert git(repo, "rev-parse", "wt-clean") == clean_before
+        assert "Restoring wt-clean to" in result.stdout
+        assert "wt-auto already at" in result.stdout
+        assert "Restoring wt-auto" not in result.stdout
+
+        listing = run_gwt(repo, "gwt-undo-sync --list")
+        assert [line.split(":")[0].strip() for line in listing.stdout.splitlines()] == ["3", "2"]
+
+
+def test_gwt_all_parallel_ordered_with_summary():
+    with tempfile.TemporaryDirectory() as tmpdir:
+        base = Path(tmpdir)
+        repo = create_conflict_repo(base)
+        (base / "wt-auto" / "dirty.txt").write_text("dirty\n")
+
+        result = run_gwt(repo, "gwt-all -j 3 rev-parse --abbrev-ref HEAD wt-missing-ref")
+
+        assert result.returncode == 1
+        out = result.stdout
+        # Headers in list order, each followed by its own output
+        headers = [out.index(f"=== {name} ===") for name in ("wt-clean", "wt-auto", "wt-complex")]
+        assert headers == sorted(headers)
+        assert out.index("wt-auto", headers[1] + 10) < headers[2]
+        summary = out.split("=== Summary ===")[1].splitlines()[1:]
+        assert [line.split()[0] for line in summary] == ["wt-clean", "wt-auto", "wt-complex"]
+        assert all("exit 128" in line for line in summary)
+
+        dirty = run_gwt(repo, "gwt-all --dirty -j 2 --interleave status --short")
+        assert dirty.returncode == 0, dirty.stderr
+        assert any("wt-auto |" in line and line.endswith("?? dirty.txt") for line in dirty.stdout.splitlines())
+        assert "wt-clean" not in dirty.stdout
+
+        # The per-call helpers don't outlive the command
+        leftovers = run_gwt(repo, (
+            "gwt-all --dirty -j 2 status --short >/dev/null; "
+            "for f in _dirty_one _run_one _run_one_prefixed _print_one; do (( $+functions[$f] )) && print -r -- $f; done"
+        ))
+        assert leftovers.stdout.strip() == ""
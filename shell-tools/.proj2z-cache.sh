@@ -0,0 +1,226 @@
+#!/usr/bin/env zsh
+# Shared cache helpers for proj2 (sourced by proj2.zsh and the helper scripts)
+# All lookups use zsh builtins so they can run per project without forking;
+# results come back in REPLY/reply rather than on stdout
+
+# zstat builtin for fork-free mtime lookups (`stat -f %m` is BSD-only and forks)
+zmodload -F zsh/stat b:zstat 2>/dev/null
+zmodload -F zsh/datetime p:EPOCHSECONDS p:EPOCHREALTIME 2>/dev/null
+zmodload -F zsh/zselect b:zselect 2>/dev/null
+
+# Get proj2z cache directory (dynamically checks variables each time); sets REPLY
+_proj2z_cache_dir() {
+  REPLY="${PROJ2Z_CACHE_DIR:-${XDG_CACHE_HOME:-${HOME}/.cache}/proj2z}"
+}
+
+# Flatten a project path into a single cache file name
+_proj2z_cache_key() {
+  REPLY="${1//\//%}"
+}
+
+# Resolve the git dir of a project (handles worktree/submodule .git files)
+# Sets REPLY to the git dir, returns 1 if the project has no git metadata
+_proj2z_git_dir() {
+  local project_path="$1"
+  if [[ -d "$project_path/.git" ]]; then
+    REPLY="$project_path/.git"
+  elif [[ -f "$project_path/.git" ]]; then
+    local gitfile="$(<"$project_path/.git")"
+    REPLY="${gitfile#gitdir: }"
+    [[ $REPLY == /* ]] || REPLY="$project_path/$REPLY"
+  else
+    REPLY=""
+    return 1
+  fi
+}
+
+# Cheap fingerprint of a repo's git state, without running git
+# Combines mtimes of .git/HEAD, .git/index (plus its size), the current ref
+# file and FETCH_HEAD, and the worktree root mtime (catches added/removed files)
+# Sets REPLY to the fingerprint, returns 1 if the project has no git metadata
+_proj2z_git_fingerprint() {
+  local project_path="$1"
+  _proj2z_git_dir "$project_path" || return 1
+  local git_dir="$REPLY"
+  local common_dir="$git_dir"
+  [[ -f "$git_dir/commondir" ]] && common_dir="${git_dir}/$(<"$git_dir/commondir")"
+
+  local -a st
+  local fp="" head ref
+
+  zstat -A st +mtime -- "$git_dir/HEAD" 2>/dev/null || { REPLY=""; return 1; }
+  fp="${st[1]}"
+
+  # Current ref: loose ref file, falling back to packed-refs
+  head="$(<"$git_dir/HEAD")"
+  if [[ $head == "ref: "* ]]; then
+    ref="${head#ref: }"
+    if zstat -A st +mtime -- "$common_dir/$ref" 2>/dev/null; then
+      fp+=":${st[1]}"
+    elif zstat -A st +mtime -- "$common_dir/packed-refs" 2>/dev/null; then
+      fp+=":p${st[1]}"
+    else
+      fp+=":-"
+    fi
+  fi
+
+  if zstat -A st +mtime +size -- "$git_dir/index" 2>/dev/null; then
+    fp+=":${st[1]}.${st[2]}"
+  else
+    fp+=":-"
+  fi
+
+  if zstat -A st +mtime -- "$common_dir/FETCH_HEAD" 2>/dev/null; then
+    fp+=":${st[1]}"
+  else
+    fp+=":-"
+  fi
+
+  zstat -A st +mtime -- "$project_path" 2>/dev/null && fp+=":${st[1]}"
+
+  REPLY="$fp"
+}
+
+# Read a cached git status entry
+# Sets reply=(fingerprint cached_at status), returns 1 on cache miss
+_proj2z_status_cache_read() {
+  local status_cache_dir="$2"
+  [[ -n $status_cache_dir ]] || { _proj2z_cache_dir; status_cache_dir="${REPLY}/status"; }
+  _proj2z_cache_key "$1"
+  local cache_file="${status_cache_dir}/${REPLY}"
+  reply=()
+  [[ -r $cache_file ]] || return 1
+  reply=("${(@f)$(<"$cache_file")}")
+  (( ${#reply} >= 2 )) || { reply=(); return 1; }
+}
+
+# Write a git status entry to the cache (atomic rename)
+# Args: project_path fingerprint status [status_cache_dir]
+_proj2z_status_cache_write() {
+  local project_path="$1" fingerprint="$2" git_status="$3"
+  local status_cache_dir="$4"
+  [[ -n $status_cache_dir ]] || { _proj2z_cache_dir; status_cache_dir="${REPLY}/status"; }
+  [[ -z $fingerprint ]] && return 1
+  [[ -d $status_cache_dir ]] || mkdir -p "$status_cache_dir"
+  _proj2z_cache_key "$project_path"
+  local cache_file="${status_cache_dir}/${REPLY}"
+  print -r -- "$fingerprint"$'\n'"${EPOCHSECONDS}"$'\n'"$git_status" > "${cache_file}.$$" \
+    && mv -f "${cache_file}.$$" "$cache_file"
+}
+
+# Run lock for the background helpers: a directory holding its owner's PID
+# Taken over only when the owner is gone, never by age, so a long run keeps it
+# Returns 1 if another live run holds the lock
+_proj2z_lock_acquire() {
+  local lock_dir="$1" owner=""
+  local -a st
+  if ! mkdir "$lock_dir" 2>/dev/null; then
+    [[ -r "$lock_dir/pid" ]] && owner="$(<"$lock_dir/pid")"
+    if [[ -n $owner ]]; then
+      kill -0 "$owner" 2>/dev/null && return 1
+    else
+      # No PID yet: the owner is between mkdir and writing it, unless it died there
+      zstat -A st +mtime -- "$lock_dir" 2>/dev/null && (( EPOCHSECONDS - st[1] < 60 )) && return 1
+    fi
+    rm -rf "$lock_dir"
+    mkdir "$lock_dir" 2>/dev/null || return 1
+  fi
+  print -r -- $$ > "$lock_dir/pid"
+}
+
+# Drop a lock taken with _proj2z_lock_acquire, if this process still owns it
+_proj2z_lock_release() {
+  local lock_dir="$1"
+  [[ -r "$lock_dir/pid" && "$(<"$lock_dir/pid")" == $$ ]] && rm -rf "$lock_dir"
+}
+
+# Stop the background CTRL-S refresh whose PID is in <live_dir>/pid, along with
+# its status engine, and wait (up to ~1s) for it to exit so it can't write into
+# a directory created after it. Leaves the directory itself to the caller.
+_proj2z_status_run_cancel() {
+  local live_dir="$1" pid=""
+  local -i tries=0
+  [[ -r "${live_dir}/pid" ]] && pid="$(<"${live_dir}/pid")"
+  [[ -n $pid ]] && kill -0 "$pid" 2>/dev/null || return 0
+  # The engine first: once the refresh exits it is reparented and out of reach
+  (( $+commands[pkill] )) && pkill -TERM -P "$pid" 2>/dev/null
+  kill "$pid" 2>/dev/null
+  while (( tries++ < 50 )) && kill -0 "$pid" 2>/dev/null; do
+    zselect -t 2
+  done
+}
+
+# Opt-in tracing: with PROJ2Z_TRACE set, each _proj2z_trace call appends
+# "<script> <phase> <ms since previous mark>" to PROJ2Z_TRACE_FILE (default:
+# trace.log in the cache dir). A no-op otherwise, so it costs nothing by default.
+_proj2z_trace() {
+  [[ -n $PROJ2Z_TRACE ]] || return 0
+  local phase="$1"
+  local -F 3 elapsed_ms=0
+  [[ -n $_PROJ2Z_TRACE_MARK ]] && elapsed_ms=$(( (EPOCHREALTIME - _PROJ2Z_TRACE_MARK) * 1000 ))
+  typeset -gF _PROJ2Z_TRACE_MARK=$EPOCHREALTIME
+  [[ $phase == start ]] && return 0
+
+  # Traced code may be between setting and reading REPLY: keep the caller's
+  local REPLY trace_file="$PROJ2Z_TRACE_FILE"
+  [[ -n $trace_file ]] || { _proj2z_cache_dir; trace_file="${REPLY}/trace.log"; }
+  [[ -d ${trace_file:h} ]] || mkdir -p "${trace_file:h}"
+  print -r -- "${ZSH_ARGZERO:t} ${phase} ${elapsed_ms}ms" >> "$trace_file"
+}
+
+# tmux session snapshot: one `tmux list-sessions` shared by proj2z, the preview
+# and session switching. Lines are name, created, attached, windows, path
+# (tab-separated). proj2z refreshes it when it starts and records every session
+# it creates; everything else only reads it.
+_proj2z_tmux_snapshot_file() {
+  _proj2z_cache_dir
+  REPLY="${REPLY}/tmux-sessions.tsv"
+}
+
+# Re-take the snapshot (empty when tmux is missing or has no server)
+_proj2z_tmux_snapshot_refresh() {
+  _proj2z_tmux_snapshot_file
+  local snapshot_file="$REPLY"
+  [[ -d ${snapshot_file:h} ]] || mkdir -p "${snapshot_file:h}"
+  if (( $+commands[tmux] )); then
+    tmux list-sessions -F $'#{session_name}\t#{session_created}\t#{session_attached}\t#{session_windows}\t#{session_path}' \
+      > "${snapshot_file}.$$" 2>/dev/null
+  else
+    : > "${snapshot_file}.$$"
+  fi
+  mv -f "${snapshot_file}.$$" "$snapshot_file"
+}
+
+# Record a session proj2z just created, without asking tmux again
+# Arguments: session_name session_path [windows]
+_proj2z_tmux_snapshot_add() {
+  _proj2z_tmux_snapshot_file
+  local snapshot_file="$REPLY"
+  [[ -d ${snapshot_file:h} ]] || mkdir -p "${snapshot_file:h}"
+  print -r -- "${1}"$'\t'"${EPOCHSECONDS}"$'\t'"1"$'\t'"${3:-1}"$'\t'"${2}" >> "$snapshot_file"
+}
+
+# Read the snapshot
+# With no argument, sets reply to every session line
+# With a session name, sets reply=(name created attached windows path) for that
+# session and returns 1 if it is not in the snapshot
+_proj2z_tmux_snapshot_read() {
+  local session_name="$1"
+  _proj2z_tmux_snapshot_file
+  local snapshot_file="$REPLY" line
+  local -a lines
+  reply=()
+  [[ -r $snapshot_file ]] && lines=("${(@f)$(<"$snapshot_file")}")
+  lines=("${(@)lines:#}")
+  if [[ -z $session_name ]]; then
+    reply=("${lines[@]}")
+    return 0
+  fi
+  for line in "${lines[@]}"; do
+    if [[ ${line%%$'\t'*} == "$session_name" ]]; then
+      reply=("${(@ps:\t:)line}")
+      return 0
+    fi
+  done
+  return 1
+}
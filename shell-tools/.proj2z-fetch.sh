@@ -0,0 +1,154 @@
+#!/usr/bin/env zsh
+# Background fetch scheduler for proj2
+# Args: [project_path...] (default: every git project in the proj2z index)
+#
+# Keeps ahead/behind counts honest by fetching projects in the background.
+# proj2z starts it detached when PROJ2Z_FETCH is set, so it never blocks the
+# picker; only one scheduler runs at a time (fetch.lock in the cache dir holds
+# the running scheduler's PID).
+#
+#   PROJ2Z_FETCH_JOBS      concurrent fetches (default 4)
+#   PROJ2Z_FETCH_INTERVAL  minimum seconds between fetches of a repo (default 3600)
+#   PROJ2Z_FETCH_MAX_BACKOFF  cap on the failure backoff (default 86400)
+#   PROJ2Z_FETCH_TIMEOUT   seconds before a single fetch is killed (default 60)
+#
+# Repos are fetched oldest FETCH_HEAD first. A failed fetch doubles that repo's
+# wait (max(interval, 60s) * 2^failures, capped). State lives in fetch-state.tsv as
+# "<path> <last_success> <failures> <next_allowed>". FETCH_HEAD is part of the
+# git fingerprint, so a landed fetch invalidates the cached status by itself.
+
+script_dir="${0:A:h}"
+source "${script_dir}/.proj2z-cache.sh"
+
+# Suppress job control
+setopt NO_NOTIFY NO_MONITOR
+zmodload -F zsh/zselect b:zselect
+
+_proj2z_cache_dir
+local cache_dir="${REPLY}"
+local state_file="${cache_dir}/fetch-state.tsv"
+local lock_dir="${cache_dir}/fetch.lock"
+local -i fetch_jobs="${PROJ2Z_FETCH_JOBS:-4}"
+local -i interval="${PROJ2Z_FETCH_INTERVAL:-3600}"
+local -i max_backoff="${PROJ2Z_FETCH_MAX_BACKOFF:-86400}"
+local -i fetch_timeout="${PROJ2Z_FETCH_TIMEOUT:-60}"
+(( fetch_jobs < 1 )) && fetch_jobs=1
+
+# One scheduler at a time; the lock is only taken over once its owner has exited
+[[ -d $cache_dir ]] || mkdir -p "$cache_dir"
+_proj2z_lock_acquire "$lock_dir" || exit 0
+trap "_proj2z_lock_release '$lock_dir'" EXIT
+
+# Candidate repos
+local -a projects fields
+local line
+if (( $# )); then
+  projects=("$@")
+elif [[ -r "${cache_dir}/index.tsv" ]]; then
+  for line in "${(@f)$(<"${cache_dir}/index.tsv")}"; do
+    [[ $line == "#"* || -z $line ]] && continue
+    fields=("${(@ps:\t:)line}")
+    [[ ${fields[4]} == 1 ]] && projects+=("${fields[1]}")
+  done
+fi
+
+# Load state
+local -A last_success failures next_allowed
+if [[ -r $state_file ]]; then
+  for line in "${(@f)$(<"$state_file")}"; do
+    fields=("${(@ps:\t:)line}")
+    [[ -z ${fields[1]} ]] && continue
+    last_success[${fields[1]}]="${fields[2]}"
+    failures[${fields[1]}]="${fields[3]}"
+    next_allowed[${fields[1]}]="${fields[4]}"
+  done
+fi
+
+# Due repos with a remote, keyed by FETCH_HEAD age (missing FETCH_HEAD = never)
+local -a due
+local project_path git_dir common_dir fetch_mtime
+local -a st
+for project_path in "${projects[@]}"; do
+  (( EPOCHSECONDS >= ${next_allowed[$project_path]:-0} )) || continue
+  _proj2z_git_dir "$project_path" || continue
+  git_dir="$REPLY"
+  common_dir="$git_dir"
+  [[ -f "$git_dir/commondir" ]] && common_dir="${git_dir}/$(<"$git_dir/commondir")"
+  [[ -r "$common_dir/config" && "$(<"$common_dir/config")" == *"[remote \""* ]] || continue
+  fetch_mtime=0
+  zstat -A st +mtime -- "$common_dir/FETCH_HEAD" 2>/dev/null && fetch_mtime="${st[1]}"
+  due+=("${(l:12::0:)fetch_mtime}"$'\t'"${project_path}")
+done
+(( ${#due} )) || exit 0
+due=("${(@o)due}")
+
+local out_dir="${lock_dir}/results"
+mkdir -p "$out_dir"
+
+# Fetch one repo, killing it after fetch_timeout seconds
+_fetch_one() {
+  local project_path="$1"
+  GIT_TERMINAL_PROMPT=0 GIT_SSH_COMMAND="${GIT_SSH_COMMAND:-ssh -o BatchMode=yes}" \
+    git -C "$project_path" fetch --quiet >/dev/null 2>&1 &
+  local pid=$! start=$EPOCHSECONDS
+  while kill -0 $pid 2>/dev/null; do
+    if (( EPOCHSECONDS - start >= fetch_timeout )); then
+      kill $pid 2>/dev/null
+      wait $pid 2>/dev/null
+      return 1
+    fi
+    zselect -t 10
+  done
+  wait $pid
+}
+
+# Worker: handles every fetch_jobs-th repo in due order, so the oldest go first
+_worker() {
+  local w=$1 k project_path
+  for (( k=w; k <= ${#due}; k += fetch_jobs )); do
+    project_path="${due[$k]#*$'\t'}"
+    if _fetch_one "$project_path"; then
+      print -r -- "${project_path}"$'\t'"ok" >> "${out_dir}/${w}"
+    else
+      print -r -- "${project_path}"$'\t'"fail" >> "${out_dir}/${w}"
+    fi
+  done
+}
+
+local -a worker_pids
+local -i w
+for (( w=1; w <= fetch_jobs && w <= ${#due}; w++ )); do
+  _worker $w &
+  worker_pids+=($!)
+done
+wait "${worker_pids[@]}" 2>/dev/null
+
+# Fold results into the state file (single writer)
+local result_file fetch_state
+local -i backoff fail_count backoff_base=$(( interval > 60 ? interval : 60 ))
+for result_file in "$out_dir"/*(N); do
+  for line in "${(@f)$(<"$result_file")}"; do
+    project_path="${line%$'\t'*}"
+    fetch_state="${line##*$'\t'}"
+    if [[ $fetch_state == ok ]]; then
+      last_success[$project_path]=$EPOCHSECONDS
+      failures[$project_path]=0
+      next_allowed[$project_path]=$(( EPOCHSECONDS + interval ))
+    else
+      fail_count=$(( ${failures[$project_path]:-0} + 1 ))
+      failures[$project_path]=$fail_count
+      (( fail_count > 30 )) && fail_count=30
+      backoff=$(( backoff_base * (1 << fail_count) ))
+      (( backoff > max_backoff )) && backoff=$max_backoff
+      next_allowed[$project_path]=$(( EPOCHSECONDS + backoff ))
+    fi
+  done
+done
+
+# Projects that no longer exist drop out of the state file
+local -a state_lines
+for project_path in "${(@k)next_allowed}"; do
+  [[ -d $project_path ]] || continue
+  state_lines+=("${project_path}"$'\t'"${last_success[$project_path]:-0}"$'\t'"${failures[$project_path]:-0}"$'\t'"${next_allowed[$project_path]}")
+done
+print -rl -- "${state_lines[@]}" > "${state_file}.$$" && mv -f "${state_file}.$$" "$state_file"
@@ -0,0 +1,101 @@
+#!/usr/bin/env zsh
+# Frecency tracking for proj2 (sourced by proj2.zsh)
+#
+# Every selection is appended to frecency.log as "<epoch><TAB><action><TAB><path>".
+# Once the log grows past PROJ2Z_FRECENCY_LOG_MAX bytes (default 8192) it is
+# folded into frecency.tsv, a table of "<path><TAB><score>" decayed to the time
+# in its "#at<TAB><epoch>" header, and the log starts over. Each selection is
+# worth 1 point, halving every PROJ2Z_FRECENCY_HALF_LIFE seconds (default one
+# week); entries that decay below 0.01 are dropped, so both files stay bounded.
+
+zmodload -F zsh/stat b:zstat 2>/dev/null
+zmodload -F zsh/datetime p:EPOCHSECONDS 2>/dev/null
+
+# Fold log entries into the table, decaying everything to now
+# Args: cache_dir
+_proj2z_frecency_compact() {
+  local cache_dir="$1"
+  local log_file="${cache_dir}/frecency.log"
+  local table_file="${cache_dir}/frecency.tsv"
+  local work_file="${log_file}.$$"
+
+  # Take the log out of the way first so concurrent appends start a new one
+  mv -f "$log_file" "$work_file" 2>/dev/null || return 0
+
+  _proj2z_frecency_scores "$table_file" "$work_file"
+  local -A scores
+  scores=("${reply[@]}")
+
+  local project_path
+  local -F 4 score
+  local -a lines
+  lines=("#at"$'\t'"${EPOCHSECONDS}")
+  for project_path in "${(@k)scores}"; do
+    score=${scores[$project_path]}
+    (( score >= 0.01 )) || continue
+    lines+=("${project_path}"$'\t'"${score}")
+  done
+
+  print -rl -- "${lines[@]}" > "${table_file}.$$" && mv -f "${table_file}.$$" "$table_file"
+  rm -f "$work_file"
+}
+
+# Compute current frecency scores from the table plus any uncompacted log
+# Args: table_file log_file
+# Sets reply to alternating path/score pairs (assign to an associative array)
+_proj2z_frecency_scores() {
+  local table_file="$1" log_file="$2"
+  local half_life="${PROJ2Z_FRECENCY_HALF_LIFE:-604800}"
+  local -A scores
+  local line
+  local -a fields
+  local -F decay=1 age
+
+  if [[ -r $table_file ]]; then
+    for line in "${(@f)$(<"$table_file")}"; do
+      fields=("${(@ps:\t:)line}")
+      if [[ ${fields[1]} == "#at" ]]; then
+        age=$(( EPOCHSECONDS - ${fields[2]:-$EPOCHSECONDS} ))
+        decay=$(( 0.5 ** (age / half_life) ))
+      elif [[ -n ${fields[1]} ]]; then
+        scores[${fields[1]}]=$(( ${fields[2]:-0} * decay ))
+      fi
+    done
+  fi
+
+  if [[ -r $log_file ]]; then
+    for line in "${(@f)$(<"$log_file")}"; do
+      fields=("${(@ps:\t:)line}")
+      [[ -n ${fields[3]} ]] || continue
+      age=$(( EPOCHSECONDS - ${fields[1]:-$EPOCHSECONDS} ))
+      scores[${fields[3]}]=$(( ${scores[${fields[3]}]:-0} + 0.5 ** (age / half_life) ))
+    done
+  fi
+
+  reply=("${(@kv)scores}")
+}
+
+# Load current frecency scores (no forks; compaction happens on record)
+# Sets reply to alternating path/score pairs (assign to an associative array)
+_proj2z_frecency_load() {
+  _proj2z_cache_dir
+  local cache_dir="${REPLY}"
+  _proj2z_frecency_scores "${cache_dir}/frecency.tsv" "${cache_dir}/frecency.log"
+}
+
+# Record a selection and compact the log once it outgrows its budget
+# Args: project_path action
+_proj2z_frecency_record() {
+  local project_path="$1" action="$2"
+  _proj2z_cache_dir
+  local cache_dir="${REPLY}"
+  local log_file="${cache_dir}/frecency.log"
+
+  [[ -d $cache_dir ]] || mkdir -p "$cache_dir"
+  print -r -- "${EPOCHSECONDS}"$'\t'"${action}"$'\t'"${project_path}" >> "$log_file"
+
+  local -a st
+  if zstat -A st +size -- "$log_file" 2>/dev/null && (( st[1] > ${PROJ2Z_FRECENCY_LOG_MAX:-8192} )); then
+    _proj2z_frecency_compact "$cache_dir"
+  fi
+}
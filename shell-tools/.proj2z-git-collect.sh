@@ -0,0 +1,126 @@
+#!/usr/bin/env zsh
+# Git status collector for proj2 (sourced by proj2.zsh and .proj2z-git-status.sh)
+# One `git status --porcelain=v2 --branch --show-stash` plus one `git log -1`
+# per repo (and a `git config` read when an upstream is set), parsed in-shell:
+# no grep/wc/date pipelines. Each call site keeps its own styling; this only
+# gathers the numbers.
+
+zmodload -F zsh/datetime p:EPOCHSECONDS 2>/dev/null
+zmodload -F zsh/stat b:zstat 2>/dev/null
+
+# Collect git status fields for a repo
+# Sets reply to:
+#   1 branch          ("HEAD" when detached or before the first commit)
+#   2 ahead  3 behind
+#   4 staged  5 unstaged  6 untracked  7 conflicted
+#   8 last_commit_epoch (0 when there are no commits)
+#   9 upstream        ("remote/branch", empty when none is configured)
+#   10 upstream_tracked (1 when the upstream ref exists, 0 when gone/none)
+#   11 stashes
+#   12 remote         (branch.<branch>.remote, "." for a local upstream; empty
+#                      when none is configured)
+# With a second argument of "no", untracked files are not scanned (the fast
+# pass of the progressive loader) and the untracked count is always 0
+# Returns 1 if git status fails (not a repo, git missing)
+_proj2z_status_collect() {
+  local project_path="$1" untracked_mode="${2:-normal}"
+  local porcelain
+  reply=()
+  porcelain="$(git -C "$project_path" status --porcelain=v2 --branch --show-stash \
+    --untracked-files="$untracked_mode" 2>/dev/null)" || return 1
+
+  local line xy oid="" branch="" upstream="" ab
+  local -i ahead=0 behind=0 tracked=0 stashes=0
+  local -i num_staged=0 num_unstaged=0 num_untracked=0 num_conflicted=0
+  for line in "${(@f)porcelain}"; do
+    case $line in
+      "# branch.oid "*) oid="${line#"# branch.oid "}" ;;
+      "# branch.head "*) branch="${line#"# branch.head "}" ;;
+      "# branch.upstream "*) upstream="${line#"# branch.upstream "}" ;;
+      "# branch.ab "*)
+        # "+<ahead> -<behind>"; only present while the upstream ref exists
+        ab="${line#"# branch.ab "}"
+        ahead="${${ab%% *}#+}"
+        behind="${${ab##* }#-}"
+        tracked=1
+        ;;
+      "# stash "*) stashes="${line#"# stash "}" ;;
+      "? "*) (( ++num_untracked )) ;;
+      [12u]" "*)
+        # Same XY rules as the porcelain v1 counts: X in MADRC is staged,
+        # Y in MD is unstaged, UU/AA/DD is a conflict
+        xy="${line[3,4]}"
+        [[ ${xy[1]} == [MADRC] ]] && (( ++num_staged ))
+        [[ ${xy[2]} == [MD] ]] && (( ++num_unstaged ))
+        [[ $xy == (UU|AA|DD) ]] && (( ++num_conflicted ))
+        ;;
+    esac
+  done
+
+  # Match `git rev-parse --abbrev-ref HEAD`, which prints HEAD in both cases
+  [[ $branch == "(detached)" || $oid == "(initial)" ]] && branch="HEAD"
+
+  local last_commit_epoch=0
+  if [[ $oid != "(initial)" ]]; then
+    last_commit_epoch="$(git -C "$project_path" log -1 --format='%ct' 2>/dev/null)"
+    last_commit_epoch=${last_commit_epoch//[^0-9]/}
+  fi
+
+  # The upstream's remote as configured: "origin/x" can't tell a remote named
+  # "origin" from a local branch, and a remote name may itself contain "/"
+  local remote=""
+  if [[ -n $upstream ]]; then
+    remote="$(git -C "$project_path" config --get "branch.${branch}.remote" 2>/dev/null)"
+    [[ -n $remote ]] || remote="${upstream%%/*}"
+  fi
+
+  reply=("$branch" "$ahead" "$behind" "$num_staged" "$num_unstaged" "$num_untracked" \
+    "$num_conflicted" "${last_commit_epoch:-0}" "$upstream" "$tracked" "$stashes" "$remote")
+}
+
+# Opt large repos into git's own status accelerators (PROJ2Z_TUNE_LARGE_REPOS=1)
+# A repo is large when its index exceeds PROJ2Z_LARGE_REPO_INDEX_BYTES (default
+# 4MB, roughly 40k tracked files). Turns on core.untrackedCache, plus the
+# builtin core.fsmonitor where git supports it (macOS/Windows), unless the repo
+# already sets them. Only reads files until a large untuned repo is found.
+_proj2z_tune_large_repo() {
+  [[ -n $PROJ2Z_TUNE_LARGE_REPOS ]] || return 0
+  local project_path="$1"
+  _proj2z_git_dir "$project_path" || return 0
+  local git_dir="$REPLY"
+  local -a st
+  zstat -A st +size -- "$git_dir/index" 2>/dev/null || return 0
+  (( st[1] > ${PROJ2Z_LARGE_REPO_INDEX_BYTES:-4194304} )) || return 0
+
+  local common_dir="$git_dir" config=""
+  [[ -f "$git_dir/commondir" ]] && common_dir="${git_dir}/$(<"$git_dir/commondir")"
+  [[ -r "$common_dir/config" ]] && config="$(<"$common_dir/config")"
+  if [[ ${config:l} != *untrackedcache* ]]; then
+    git -C "$project_path" config core.untrackedCache true 2>/dev/null
+  fi
+  if [[ ${config:l} != *fsmonitor* && ( $OSTYPE == darwin* || $OSTYPE == (msys|cygwin)* ) ]]; then
+    git -C "$project_path" config core.fsmonitor true 2>/dev/null
+  fi
+  return 0
+}
+
+# Compact age of a commit epoch ("42m", "3h", "5d", "2w", "4mo")
+# Sets REPLY, empty when the epoch is 0
+_proj2z_time_ago() {
+  local -i epoch="${1:-0}" diff
+  REPLY=""
+  (( epoch > 0 )) || return 0
+  diff=$(( EPOCHSECONDS - epoch ))
+  (( diff < 0 )) && diff=0
+  if (( diff < 3600 )); then
+    REPLY="$((diff / 60))m"
+  elif (( diff < 86400 )); then
+    REPLY="$((diff / 3600))h"
+  elif (( diff < 604800 )); then
+    REPLY="$((diff / 86400))d"
+  elif (( diff < 2592000 )); then
+    REPLY="$((diff / 604800))w"
+  else
+    REPLY="$((diff / 2592000))mo"
+  fi
+}
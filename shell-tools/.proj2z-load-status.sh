@@ -1,60 +1,200 @@
 #!/usr/bin/env zsh
 # Load git status for all projects and output filtered list
 # Args: query project_data_file script_dir
+#
+# Stale-while-revalidate: repos whose git fingerprint matches the status cache
+# are served straight from cache. Repos whose fingerprint moved (or whose entry
+# is older than PROJ2Z_STATUS_CACHE_TTL seconds) are shown with their cached
+# status and a ↻ marker and recomputed. All git work goes through the bounded
+# worker pool in .proj2z-status-engine.sh.
+#
+# Streaming (fzf exported $FZF_PORT and curl is available): every row is printed
+# immediately, uncached repos with a … placeholder, and the engine runs in the
+# background. As results land, fzf is told to reload this script in render-only
+# mode (PROJ2Z_NO_REVALIDATE=1), at most every PROJ2Z_STREAM_INTERVAL seconds;
+# fzf --track keeps the cursor on the same project across reloads. Requests
+# carry the picker's FZF_API_KEY, which proj2z sets for every listening fzf.
+# Without $FZF_PORT, uncached repos get a single full pass in the foreground
+# instead (PROJ2Z_STATUS_TIMEOUT budget; timeouts are retried in the background).
+#
+# Progressive: every streaming refresh runs in two passes. A fast pass (no untracked scan,
+# PROJ2Z_STATUS_TIMEOUT budget) renders branch, ahead/behind and S/U with a …
+# marker; a full pass (PROJ2Z_STREAM_TIMEOUT budget, default 5s) then fills in
+# untracked counts, upgrades the row in place and is the only result cached.
 
 query="$1"
 project_data_file="$2"
 script_dir="$3"
-git_status_script="${script_dir}/.proj2z-git-status.sh"
+status_engine="${script_dir}/.proj2z-status-engine.sh"
+loader_script="${0:A}"
+
+source "${script_dir}/.proj2z-cache.sh"
+source "${script_dir}/.proj2z-match.sh"
 
 # Suppress job control
 setopt LOCAL_OPTIONS NO_NOTIFY NO_MONITOR
 
+_proj2z_cache_dir
+local status_cache_dir="${REPLY}/status"
+local cache_ttl="${PROJ2Z_STATUS_CACHE_TTL:-300}"
+local stale_marker=$'\033[38;5;246m↻\033[0m'
+local timeout_marker=$'\033[38;5;246mtimed out\033[0m'
+local pending_marker=$'\033[38;5;246m…\033[0m'
+
+# Results of the current CTRL-S run, shared with the render-only reloads it triggers
+local live_dir="${project_data_file}.status"
+local render_only=0 streaming=0
+[[ -n $PROJ2Z_NO_REVALIDATE ]] && render_only=1
+[[ -n $FZF_PORT ]] && (( $+commands[curl] )) && streaming=1
+if (( ! render_only )); then
+  # A new CTRL-S supersedes the previous run: stop it before reusing its dir
+  _proj2z_status_run_cancel "$live_dir"
+  rm -rf "$live_dir"
+  mkdir -p "$live_dir"
+fi
+
 # Create temp dir for status output
 local status_dir=$(mktemp -d)
 trap "rm -rf '$status_dir'" EXIT
 
-# Pure zsh timeout using background + sleep + kill
-_timeout_run() {
-  local timeout=$1 outfile=$2
-  shift 2
-  "$@" > "$outfile" &
-  local cmd_pid=$!
-  ( sleep $timeout; kill $cmd_pid 2>/dev/null ) &
-  local killer_pid=$!
-  wait $cmd_pid 2>/dev/null
-  kill $killer_pid 2>/dev/null
-  wait $killer_pid 2>/dev/null
+# Ask fzf to re-render the list from the cache
+_push_reload() {
+  curl -s -XPOST "localhost:${FZF_PORT}" ${FZF_API_KEY:+-H} ${FZF_API_KEY:+"x-api-key: ${FZF_API_KEY}"} \
+    -d "reload:PROJ2Z_NO_REVALIDATE=1 zsh ${(q)loader_script} {q} ${(q)project_data_file} ${(q)script_dir}" \
+    >/dev/null 2>&1
+}
+
+# Run the status engine over a jobs file
+# Args: jobs_file out_dir timeout [push_interval] [pass]
+# pass "fast" skips the untracked scan and leaves the cache alone; the default
+# full pass caches each result as it lands. With a push interval, fzf is
+# reloaded at most that often while results stream in.
+_refresh_statuses() {
+  local jobs_file=$1 out_dir=$2 timeout=$3 push_interval=$4 pass=${5:-full}
+  local job_idx job_state last_push=0 untracked_mode=normal
+  [[ $pass == fast ]] && untracked_mode=no
+  mkdir -p "$out_dir"
+  while IFS=$'\t' read -r job_idx job_state; do
+    if [[ $job_state != ok ]]; then
+      [[ $pass == full && -z ${fast_status[$job_idx]} ]] && all_status[$job_idx]="$timeout_marker"
+      [[ $pass == full && -n ${fast_status[$job_idx]} ]] && all_status[$job_idx]="${fast_status[$job_idx]}"
+    elif [[ $pass == fast ]]; then
+      fast_status[$job_idx]=$(<"${out_dir}/${job_idx}")
+      all_status[$job_idx]="${fast_status[$job_idx]} ${pending_marker}"
+    else
+      all_status[$job_idx]=$(<"${out_dir}/${job_idx}")
+      _proj2z_status_cache_write "${all_paths[$job_idx]}" "${all_fingerprints[$job_idx]}" "${all_status[$job_idx]}" "$status_cache_dir"
+    fi
+    if [[ -n $push_interval ]] && (( EPOCHREALTIME - last_push >= push_interval )); then
+      _push_reload
+      last_push=$EPOCHREALTIME
+    fi
+  done < <(PROJ2Z_STATUS_UNTRACKED=$untracked_mode zsh "$status_engine" "$jobs_file" "$out_dir" "$script_dir" "$timeout")
+  [[ -n $push_interval ]] && _push_reload
+}
+
+# Both passes over one jobs file: fast into out_dir/fast, then full into out_dir
+# Args: jobs_file out_dir fast_timeout full_timeout [push_interval]
+_refresh_progressive() {
+  local jobs_file=$1 out_dir=$2 fast_timeout=$3 full_timeout=$4 push_interval=$5
+  _refresh_statuses "$jobs_file" "${out_dir}/fast" "$fast_timeout" "$push_interval" fast
+  _refresh_statuses "$jobs_file" "$out_dir" "$full_timeout" "$push_interval" full
 }
 
-# Read project data and launch parallel git status jobs
-local -a all_paths all_displays all_mtimes all_active
+# Read project data and serve what the cache already knows; everything else is
+# queued as a refresh job (uncached repos separately, so the non-streaming path
+# can compute them in the foreground)
+local -a all_paths all_displays all_mtimes all_active all_ranks all_status all_fingerprints fast_status
+local -a stale_jobs uncached_jobs
 local i=0
-while IFS=$'\t' read -r proj_path proj_display proj_mtime proj_active; do
+while IFS=$'\t' read -r proj_path proj_display proj_mtime proj_active proj_has_git proj_rank proj_usage; do
   [[ -z "$proj_path" ]] && continue
   i=$((i + 1))
   all_paths+=("$proj_path")
-  all_displays+=("$proj_display")
+  # Usage columns (PROJ2Z_USAGE) stay between the name and the git status
+  all_displays+=("${proj_display}${proj_usage}")
   all_mtimes+=("$proj_mtime")
   all_active+=("$proj_active")
+  all_ranks+=("${(l:10::0:)${proj_rank:-0}}")
+  all_status[$i]=""
+  all_fingerprints[$i]=""
+
+  # has_git comes from the project index; fall back to probing if absent
+  [[ $proj_has_git == 1 || ( -z $proj_has_git && -e "$proj_path/.git" ) ]] || continue
+
+  _proj2z_git_fingerprint "$proj_path"
+  all_fingerprints[$i]="$REPLY"
 
-  if [[ -d "$proj_path/.git" ]]; then
-    _timeout_run 0.5 "${status_dir}/${i}" zsh "$git_status_script" "$proj_path" &
+  # Fast-pass result from the current run, waiting on its untracked scan
+  fast_status[$i]=""
+  if [[ -s "${live_dir}/fast/${i}" ]] && (( render_only )); then
+    fast_status[$i]="$(<"${live_dir}/fast/${i}")"
+  fi
+
+  if _proj2z_status_cache_read "$proj_path" "$status_cache_dir" \
+    && [[ ${reply[1]} == "${all_fingerprints[$i]}" ]] && (( EPOCHSECONDS - ${reply[2]:-0} < cache_ttl )); then
+    all_status[$i]="${reply[3]}"
+  elif [[ -n ${fast_status[$i]} ]]; then
+    # Full pass timed out: the fast result is final, otherwise still upgrading
+    if [[ -e "${live_dir}/${i}.timeout" ]]; then
+      all_status[$i]="${fast_status[$i]}"
+    else
+      all_status[$i]="${fast_status[$i]} ${pending_marker}"
+    fi
+  elif (( ${#reply} )); then
+    all_status[$i]="${reply[3]:+${reply[3]} }${stale_marker}"
+    stale_jobs+=("${i}"$'\t'"${proj_path}")
+  elif [[ -e "${live_dir}/${i}.timeout" ]]; then
+    all_status[$i]="$timeout_marker"
   else
-    echo "" > "${status_dir}/${i}" &
+    all_status[$i]="$pending_marker"
+    uncached_jobs+=("${i}"$'\t'"${proj_path}")
   fi
 done < "$project_data_file"
-wait
+
+if (( ! render_only && streaming )); then
+  # Stream: print placeholders now, fill them in from the background
+  if (( ${#stale_jobs} + ${#uncached_jobs} )); then
+    print -rl -- "${uncached_jobs[@]}" "${stale_jobs[@]}" > "${live_dir}/jobs"
+    {
+      trap - EXIT
+      _refresh_progressive "${live_dir}/jobs" "$live_dir" "${PROJ2Z_STATUS_TIMEOUT:-0.5}" \
+        "${PROJ2Z_STREAM_TIMEOUT:-5}" "${PROJ2Z_STREAM_INTERVAL:-0.3}"
+    } >/dev/null 2>&1 &!
+    print -r -- $! > "${live_dir}/pid"
+  fi
+elif (( ! render_only )); then
+  # No way to push updates: a single full pass over uncached repos in the
+  # foreground, so every row is final when it is printed
+  local -a retry_jobs
+  local job
+  if (( ${#uncached_jobs} )); then
+    print -rl -- "${uncached_jobs[@]}" > "${status_dir}/jobs"
+    _refresh_statuses "${status_dir}/jobs" "$status_dir" "${PROJ2Z_STATUS_TIMEOUT:-0.5}"
+    for job in "${uncached_jobs[@]}"; do
+      [[ ${all_status[${job%%$'\t'*}]} == "$timeout_marker" ]] && retry_jobs+=("$job")
+    done
+  fi
+
+  # ...then retry timeouts on the longer budget and revalidate stale entries in
+  # the background, for the next load
+  if (( ${#stale_jobs} + ${#retry_jobs} )); then
+    print -rl -- "${retry_jobs[@]}" "${stale_jobs[@]}" > "${live_dir}/jobs"
+    {
+      trap - EXIT
+      _refresh_statuses "${live_dir}/jobs" "$live_dir" "${PROJ2Z_STREAM_TIMEOUT:-5}"
+    } >/dev/null 2>&1 &!
+    print -r -- $! > "${live_dir}/pid"
+  fi
+fi
 
 # Build display strings with git status
 local -a active_with_mtime inactive_with_mtime
 for (( j=1; j <= i; j++ )); do
   local display="${all_displays[$j]}"
-  local mtime="${all_mtimes[$j]}"
+  local sort_key="${all_ranks[$j]}${all_mtimes[$j]}"
   local is_active="${all_active[$j]}"
-  local git_status=""
-
-  [[ -f "${status_dir}/${j}" ]] && git_status=$(<"${status_dir}/${j}")
+  local git_status="${all_status[$j]}"
 
   local display_full
   if [[ -n "$git_status" ]]; then
@@ -64,13 +204,13 @@ for (( j=1; j <= i; j++ )); do
   fi
 
   if [[ "$is_active" == "1" ]]; then
-    active_with_mtime+=("${mtime}|● ${display_full}")
+    active_with_mtime+=("${sort_key}|● ${display_full}")
   else
-    inactive_with_mtime+=("${mtime}|${display_full}")
+    inactive_with_mtime+=("${sort_key}|${display_full}")
   fi
 done
 
-# Sort by mtime (descending)
+# Sort by rank, then mtime (descending), matching proj2z's initial order
 local -a sorted_active sorted_inactive
 for entry in ${(On)active_with_mtime}; do
   sorted_active+=("${entry#*|}")
@@ -79,25 +219,6 @@ for entry in ${(On)inactive_with_mtime}; do
   sorted_inactive+=("${entry#*|}")
 done
 
-# Strip ANSI for matching
-_strip_ansi() {
-  echo "$1" | sed $'s/\x1b\\[[0-9;]*m//g'
-}
-
-_matches_query() {
-  local item="$1" q="$2"
-  [[ -z "$q" ]] && return 0
-  local clean=$(_strip_ansi "$item")
-  [[ "${clean:l}" == *"${q:l}"* ]]
-}
-
 # Output filtered results (active first, then inactive)
-for item in "${sorted_active[@]}"; do
-  [[ -z "$item" ]] && continue
-  _matches_query "$item" "$query" && echo "$item"
-done
-
-for item in "${sorted_inactive[@]}"; do
-  [[ -z "$item" ]] && continue
-  _matches_query "$item" "$query" && echo "$item"
-done
+_proj2z_filter_group "$query" "${sorted_active[@]}"
+_proj2z_filter_group "$query" "${sorted_inactive[@]}"
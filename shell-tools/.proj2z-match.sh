@@ -0,0 +1,123 @@
+#!/usr/bin/env zsh
+# Shared matching helpers for proj2 (sourced by the filter and status loader)
+# Rows are "key<TAB>row" where key is the lowercase plain text to match against;
+# bare rows (no tab) get a key derived in-shell. Nothing here forks, so matching
+# cost per keystroke is pure zsh string work.
+#
+# PROJ2Z_MATCH_MODE selects the matcher:
+#   substring (default)  case-insensitive substring, rows keep their order
+#   rank                 fzf-style fuzzy match; each space-separated term must
+#                        match, rows are ordered by score within their group
+
+# Derive a match key from a display row: strip ANSI codes and the active icon
+# Sets REPLY to the key
+_proj2z_match_key() {
+  setopt LOCAL_OPTIONS EXTENDED_GLOB
+  local plain="${1//$'\e'\[[0-9;]#m/}"
+  plain="${plain#● }"
+  REPLY="${plain:l}"
+}
+
+# Score a fuzzy match of term against key (both lowercase)
+# Bonuses: +16 per matched char, +8 at a word boundary, +4 for consecutive
+# matches, +2 inside the basename, +20 when the basename starts with the term;
+# -1 per skipped char inside the matched window
+# Sets REPLY to the score, returns 1 when term is not a subsequence of key
+_proj2z_fuzzy_score() {
+  local term="$1" key="$2"
+  local -i tlen=${#term} klen=${#key} ti=1 ki start end
+
+  # Forward pass: earliest position where the whole term has been seen
+  for (( ki=1; ki <= klen && ti <= tlen; ki++ )); do
+    [[ ${key[ki]} == "${term[ti]}" ]] && (( ti++ ))
+  done
+  (( ti > tlen )) || return 1
+  end=$(( ki - 1 ))
+
+  # Backward pass: tightest window ending there
+  ti=$tlen
+  for (( ki=end; ki >= 1 && ti >= 1; ki-- )); do
+    [[ ${key[ki]} == "${term[ti]}" ]] && (( ti-- ))
+  done
+  start=$(( ki + 1 ))
+
+  local -i score=0 last_match=-1 basename_start=1
+  [[ $key == */* ]] && basename_start=$(( ${#${key%/*}} + 2 ))
+
+  ti=1
+  for (( ki=start; ki <= end; ki++ )); do
+    if [[ ${key[ki]} == "${term[ti]}" ]]; then
+      (( score += 16 ))
+      if (( ki == 1 )) || [[ ${key[ki-1]} == [[:space:]/_.-] ]]; then
+        (( score += 8 ))
+      fi
+      (( last_match == ki - 1 )) && (( score += 4 ))
+      (( ki >= basename_start )) && (( score += 2 ))
+      last_match=$ki
+      (( ti++ ))
+    else
+      (( score -= 1 ))
+    fi
+  done
+
+  [[ ${key[basename_start,-1]} == "${term}"* ]] && (( score += 20 ))
+  REPLY=$score
+}
+
+# Print the rows of one group that match query, in the configured mode
+# Args: query rows...
+# Called once per group (active, then inactive) so grouping is preserved
+_proj2z_filter_group() {
+  local query="${1:l}"
+  shift
+  local mode="${PROJ2Z_MATCH_MODE:-substring}"
+  local line key row term pattern c
+  local -a terms patterns ranked
+  local -i idx=0 t total sort_score sort_idx
+
+  if [[ $mode == rank ]]; then
+    terms=(${=query})
+    # Cheap subsequence prefilter per term (*a*b*c*) before scoring
+    for term in "${terms[@]}"; do
+      pattern="*"
+      for c in "${(@s::)term}"; do
+        pattern+="${(b)c}*"
+      done
+      patterns+=("$pattern")
+    done
+  fi
+
+  for line in "$@"; do
+    [[ -z $line ]] && continue
+    (( idx++ ))
+    if [[ $line == *$'\t'* ]]; then
+      key="${line%%$'\t'*}"
+      row="${line#*$'\t'}"
+    else
+      row="$line"
+      _proj2z_match_key "$row"
+      key="$REPLY"
+    fi
+
+    if [[ -z ${query// } ]]; then
+      print -r -- "$row"
+    elif [[ $mode == rank ]]; then
+      total=0
+      for (( t=1; t <= ${#terms}; t++ )); do
+        [[ $key == ${~patterns[t]} ]] || continue 2
+        _proj2z_fuzzy_score "${terms[t]}" "$key" || continue 2
+        (( total += REPLY ))
+      done
+      # Sort key: score descending, then original order
+      sort_score=$(( total + 10000000 ))
+      sort_idx=$(( 99999999 - idx ))
+      ranked+=("${(l:8::0:)sort_score}${(l:8::0:)sort_idx}"$'\t'"$row")
+    elif [[ $key == *"$query"* ]]; then
+      print -r -- "$row"
+    fi
+  done
+
+  for line in "${(@O)ranked}"; do
+    print -r -- "${line#*$'\t'}"
+  done
+}
@@ -1,46 +1,163 @@
 #!/usr/bin/env zsh
 # Preview script for proj2 - shows project info, tmux session, and git status
-
-# Debug logging
-exec 2>>/tmp/proj2-preview-debug.log
-echo "=== Preview called at $(date) ===" >&2
-echo "All args: $@" >&2
-echo "Arg count: $#" >&2
+#
+# The git section is the expensive part, so it is cached per project under
+# preview/ in the cache dir, keyed by the repo's git fingerprint plus its tmux
+# session state; moving back onto a row whose repo hasn't changed costs no git
+# calls at all. Set PROJ2Z_TRACE=1 to log per-phase timings (see _proj2z_trace).
 
 project_display="$1"
 shift
 proj_dirs=("$@")
 
-echo "project_display: $project_display" >&2
-echo "proj_dirs: ${proj_dirs[@]}" >&2
+source "${0:A:h}/.proj2z-cache.sh"
+setopt EXTENDED_GLOB
+
+_proj2z_trace start
 
 # Remove the ● icon if present
 project_display="${project_display#● }"
 
-# Strip ANSI codes first (use sed for reliable escape sequence handling)
-project_display_clean=$(echo "$project_display" | sed $'s/\x1b\\[[0-9;]*m//g')
+# Strip ANSI codes
+project_display_clean="${project_display//$'\e'\[[0-9;]#m/}"
 
 # Extract just the project path (before the double-space where git status starts)
 project_path_part="${project_display_clean%%  *}"
 project_name="${project_path_part##*/}"
+# Path below the root, for nested layouts ("root/org/repo" -> "org/repo")
+project_rel="${project_path_part#*/}"
+
+# Print the p10k-styled git section for the current directory
+_preview_git_block() {
+  # ANSI 256-color codes matching p10k
+  local reset=$'\033[0m'
+  local bold=$'\033[1m'
+  local underline=$'\033[4m'
+  local meta=$'\033[38;5;246m'      # grey
+  local clean=$'\033[38;5;76m'      # green
+  local staged=$'\033[38;5;40m'     # bright green
+  local unstaged=$'\033[38;5;160m'  # red
+  local vcs_ahead=$'\033[38;5;39m'  # cyan
+  local vcs_behind=$'\033[38;5;178m' # yellow
+  local vcs_remote=$'\033[38;5;28m' # dark green
+  local conflicted=$'\033[38;5;196m' # bright red
+  local modified=$'\033[38;5;178m'  # yellow
+
+  # Gather git info
+  local branch=$(git rev-parse --abbrev-ref HEAD 2>/dev/null)
+  local remote_name=$(git config --get branch.$branch.remote 2>/dev/null)
+  local remote_branch=$(git rev-parse --abbrev-ref @{upstream} 2>/dev/null)
+  remote_branch=${remote_branch#*/}  # Strip remote name prefix
+
+  local ahead=$(git rev-list --count @{upstream}..HEAD 2>/dev/null || echo 0)
+  local behind=$(git rev-list --count HEAD..@{upstream} 2>/dev/null || echo 0)
+
+  local num_staged=$(git diff --cached --numstat 2>/dev/null | wc -l | tr -d ' ')
+  local num_unstaged=$(git diff --numstat 2>/dev/null | wc -l | tr -d ' ')
+  local num_untracked=$(git ls-files --others --exclude-standard 2>/dev/null | wc -l | tr -d ' ')
+  local num_conflicted=$(git diff --name-only --diff-filter=U 2>/dev/null | wc -l | tr -d ' ')
+  local num_stashes=$(git stash list 2>/dev/null | wc -l | tr -d ' ')
+  local action=$(git status 2>/dev/null | head -1 | grep -oE '(rebas|merg|cherry|revert|bisect)ing' || true)
+
+  # Build the status line matching p10k format
+  local res=""
+
+  # Commits ahead/behind (shown first)
+  if [[ $behind -gt 0 ]]; then
+    res+="${bold}${vcs_behind}-${underline}${behind}${reset}${meta}"
+  fi
+  if [[ $behind -gt 0 && $ahead -gt 0 ]]; then
+    res+=" "
+  fi
+  if [[ $ahead -gt 0 ]]; then
+    res+="${bold}${vcs_ahead}+${underline}${ahead}${reset}${meta}"
+  fi
+  [[ $ahead -gt 0 || $behind -gt 0 ]] && res+=" "
+
+  # Branch name (green)
+  if [[ -n $branch ]]; then
+    # Truncate long branch names: first 12 … last 12
+    if [[ ${#branch} -gt 32 ]]; then
+      branch="${branch:0:12}…${branch: -12}"
+    fi
+    res+="${clean}${branch}${reset}"
+  fi
+
+  # Remote tracking info in brackets [remote/branch SU]
+  res+=" ${meta}[${vcs_remote}"
+  if [[ -n $remote_branch ]]; then
+    res+="${remote_name}/${remote_branch}"
+    # Staged/Unstaged/Untracked indicators
+    if [[ $num_staged -gt 0 || $num_unstaged -gt 0 || $num_untracked -gt 0 ]]; then
+      res+=" ${bold}"
+      [[ $num_staged -gt 0 ]] && res+="${staged}S"
+      [[ $num_unstaged -gt 0 ]] && res+="${unstaged}U"
+      [[ $num_untracked -gt 0 ]] && res+="${meta}T"
+      res+="${reset}"
+    fi
+  else
+    res+="${meta}(none)"
+  fi
+  res+="${meta}]${reset}"
+
+  # Merge conflicts
+  [[ $num_conflicted -gt 0 ]] && res+=" ${conflicted}~${num_conflicted}${reset}"
+
+  # Stashes
+  [[ $num_stashes -gt 0 ]] && res+=" ${meta}(${num_stashes} stashed)${reset}"
+
+  # Action (merge, rebase, etc.)
+  [[ -n $action ]] && res+=" ${conflicted}${action}${reset}"
+
+  echo "📊 ${res}"
+  echo ""
 
-echo "After processing - project_name: $project_name" >&2
+  # Last commit info (additional context not in p10k)
+  local last_commit_time=$(git log -1 --format='%ar' 2>/dev/null)
+  local last_commit_msg=$(git log -1 --format='%s' 2>/dev/null | head -c 60)
+  if [[ -n $last_commit_time ]]; then
+    echo "${meta}Last commit:${reset} $last_commit_time"
+    echo "${meta}\"${last_commit_msg}\"${reset}"
+    echo ""
+  fi
+
+  # Remote URL
+  local remote_url=$(git config --get remote.origin.url 2>/dev/null)
+  if [[ -n $remote_url ]]; then
+    # Convert git@ to https for display
+    if [[ $remote_url == git@* ]]; then
+      remote_url=${remote_url#git@}
+      remote_url=${remote_url/://}
+      remote_url="https://${remote_url%.git}"
+    fi
+    echo "${meta}Remote:${reset} $remote_url"
+    echo ""
+  fi
+}
 
 # Find the actual project path
 for base_dir in "${proj_dirs[@]}"; do
-  echo "Checking base_dir: $base_dir" >&2
   test_path="${base_dir}/${project_name}"
-  echo "test_path: $test_path" >&2
-  echo "Exists: $([[ -d "$test_path" ]] && echo yes || echo no)" >&2
+  if [[ ${project_path_part%%/*} == ${base_dir:t} && -d "${base_dir}/${project_rel}" ]]; then
+    test_path="${base_dir}/${project_rel}"
+  fi
   if [[ -d "$test_path" ]]; then
+    _proj2z_trace resolve
     echo "📁 Path: $test_path"
     echo ""
 
-    # Check for tmux session
-    if command -v tmux &>/dev/null && tmux has-session -t "$project_name" 2>/dev/null; then
-      session_created=$(tmux display-message -p -t "$project_name" '#{session_created}')
-      current_time=$(date +%s)
-      session_age=$((current_time - session_created))
+    # Check for tmux session in proj2z's snapshot (no tmux query per preview);
+    # the session state doubles as part of the cache key
+    session_created="" session_attached=0 session_windows=""
+    if _proj2z_tmux_snapshot_read "$project_name"; then
+      session_created="${reply[2]}"
+      session_attached="${reply[3]:-0}"
+      session_windows="${reply[4]}"
+    fi
+    _proj2z_trace tmux
+
+    if [[ -n $session_created ]]; then
+      session_age=$((EPOCHSECONDS - session_created))
 
       # Convert to human readable
       days=$((session_age / 86400))
@@ -55,116 +172,30 @@ for base_dir in "${proj_dirs[@]}"; do
       else
         echo "   Alive for: ${mins}m"
       fi
+      if [[ -n $session_windows ]]; then
+        (( session_attached > 0 )) && echo "   Windows: ${session_windows} (attached)" || echo "   Windows: ${session_windows}"
+      fi
       echo ""
     fi
 
-    # Git status (styled to match p10k)
-    if [[ -d "$test_path/.git" ]]; then
-      cd "$test_path"
-
-      # ANSI 256-color codes matching p10k
-      local reset=$'\033[0m'
-      local bold=$'\033[1m'
-      local underline=$'\033[4m'
-      local meta=$'\033[38;5;246m'      # grey
-      local clean=$'\033[38;5;76m'      # green
-      local staged=$'\033[38;5;40m'     # bright green
-      local unstaged=$'\033[38;5;160m'  # red
-      local vcs_ahead=$'\033[38;5;39m'  # cyan
-      local vcs_behind=$'\033[38;5;178m' # yellow
-      local vcs_remote=$'\033[38;5;28m' # dark green
-      local conflicted=$'\033[38;5;196m' # bright red
-      local modified=$'\033[38;5;178m'  # yellow
-
-      # Gather git info
-      local branch=$(git rev-parse --abbrev-ref HEAD 2>/dev/null)
-      local remote_name=$(git config --get branch.$branch.remote 2>/dev/null)
-      local remote_branch=$(git rev-parse --abbrev-ref @{upstream} 2>/dev/null)
-      remote_branch=${remote_branch#*/}  # Strip remote name prefix
-
-      local ahead=$(git rev-list --count @{upstream}..HEAD 2>/dev/null || echo 0)
-      local behind=$(git rev-list --count HEAD..@{upstream} 2>/dev/null || echo 0)
-
-      local num_staged=$(git diff --cached --numstat 2>/dev/null | wc -l | tr -d ' ')
-      local num_unstaged=$(git diff --numstat 2>/dev/null | wc -l | tr -d ' ')
-      local num_untracked=$(git ls-files --others --exclude-standard 2>/dev/null | wc -l | tr -d ' ')
-      local num_conflicted=$(git diff --name-only --diff-filter=U 2>/dev/null | wc -l | tr -d ' ')
-      local num_stashes=$(git stash list 2>/dev/null | wc -l | tr -d ' ')
-      local action=$(git status 2>/dev/null | head -1 | grep -oE '(rebas|merg|cherry|revert|bisect)ing' || true)
-
-      # Build the status line matching p10k format
-      local res=""
-
-      # Commits ahead/behind (shown first)
-      if [[ $behind -gt 0 ]]; then
-        res+="${bold}${vcs_behind}-${underline}${behind}${reset}${meta}"
-      fi
-      if [[ $behind -gt 0 && $ahead -gt 0 ]]; then
-        res+=" "
-      fi
-      if [[ $ahead -gt 0 ]]; then
-        res+="${bold}${vcs_ahead}+${underline}${ahead}${reset}${meta}"
-      fi
-      [[ $ahead -gt 0 || $behind -gt 0 ]] && res+=" "
-
-      # Branch name (green)
-      if [[ -n $branch ]]; then
-        # Truncate long branch names: first 12 … last 12
-        if [[ ${#branch} -gt 32 ]]; then
-          branch="${branch:0:12}…${branch: -12}"
-        fi
-        res+="${clean}${branch}${reset}"
-      fi
-
-      # Remote tracking info in brackets [remote/branch SU]
-      res+=" ${meta}[${vcs_remote}"
-      if [[ -n $remote_branch ]]; then
-        res+="${remote_name}/${remote_branch}"
-        # Staged/Unstaged/Untracked indicators
-        if [[ $num_staged -gt 0 || $num_unstaged -gt 0 || $num_untracked -gt 0 ]]; then
-          res+=" ${bold}"
-          [[ $num_staged -gt 0 ]] && res+="${staged}S"
-          [[ $num_unstaged -gt 0 ]] && res+="${unstaged}U"
-          [[ $num_untracked -gt 0 ]] && res+="${meta}T"
-          res+="${reset}"
-        fi
+    # Git status (styled to match p10k), served from cache when the repo is unchanged
+    if [[ -e "$test_path/.git" ]]; then
+      _proj2z_cache_dir
+      preview_cache_dir="${REPLY}/preview"
+      _proj2z_git_fingerprint "$test_path"
+      cache_fingerprint="${REPLY}|${session_created:--}"
+
+      if _proj2z_status_cache_read "$test_path" "$preview_cache_dir" \
+        && [[ ${reply[1]} == "$cache_fingerprint" ]] \
+        && (( EPOCHSECONDS - ${reply[2]:-0} < ${PROJ2Z_STATUS_CACHE_TTL:-300} )); then
+        print -rl -- "${(@)reply[3,-1]}"
+        _proj2z_trace cache-hit
       else
-        res+="${meta}(none)"
-      fi
-      res+="${meta}]${reset}"
-
-      # Merge conflicts
-      [[ $num_conflicted -gt 0 ]] && res+=" ${conflicted}~${num_conflicted}${reset}"
-
-      # Stashes
-      [[ $num_stashes -gt 0 ]] && res+=" ${meta}(${num_stashes} stashed)${reset}"
-
-      # Action (merge, rebase, etc.)
-      [[ -n $action ]] && res+=" ${conflicted}${action}${reset}"
-
-      echo "📊 ${res}"
-      echo ""
-
-      # Last commit info (additional context not in p10k)
-      local last_commit_time=$(git log -1 --format='%ar' 2>/dev/null)
-      local last_commit_msg=$(git log -1 --format='%s' 2>/dev/null | head -c 60)
-      if [[ -n $last_commit_time ]]; then
-        echo "${meta}Last commit:${reset} $last_commit_time"
-        echo "${meta}\"${last_commit_msg}\"${reset}"
-        echo ""
-      fi
-
-      # Remote URL
-      local remote_url=$(git config --get remote.origin.url 2>/dev/null)
-      if [[ -n $remote_url ]]; then
-        # Convert git@ to https for display
-        if [[ $remote_url == git@* ]]; then
-          remote_url=${remote_url#git@}
-          remote_url=${remote_url/://}
-          remote_url="https://${remote_url%.git}"
-        fi
-        echo "${meta}Remote:${reset} $remote_url"
-        echo ""
+        git_block="$(cd "$test_path" && _preview_git_block)"
+        _proj2z_trace git
+        print -r -- "$git_block"
+        _proj2z_status_cache_write "$test_path" "$cache_fingerprint" "$git_block" "$preview_cache_dir"
+        _proj2z_trace cache-write
       fi
     fi
 
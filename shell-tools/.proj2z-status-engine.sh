@@ -0,0 +1,103 @@
+#!/usr/bin/env zsh
+# Bounded worker-pool git status engine for proj2
+# Args: jobs_file out_dir script_dir [timeout]
+#   jobs_file: one "index<TAB>project_path" line per repo
+# Writes each repo's status to out_dir/<index> and prints "<index><TAB><state>"
+# to stdout as soon as that repo finishes (state: ok or timeout)
+#
+# A fixed pool of PROJ2Z_STATUS_JOBS workers (default: CPU count) works through
+# the repos, so at most pool-size git processes run at once. A single deadline
+# scheduler watches every in-flight job and kills the ones that exceed the
+# per-repo timeout (PROJ2Z_STATUS_TIMEOUT, default 0.5s), measured from when
+# the repo actually started rather than from when it was queued.
+
+jobs_file="$1"
+out_dir="$2"
+script_dir="$3"
+timeout="${4:-${PROJ2Z_STATUS_TIMEOUT:-0.5}}"
+git_status_script="${script_dir}/.proj2z-git-status.sh"
+
+# Suppress job control
+setopt NO_NOTIFY NO_MONITOR
+
+zmodload zsh/datetime
+zmodload -F zsh/zselect b:zselect
+
+_cpu_count() {
+  local n
+  n=$(nproc 2>/dev/null || sysctl -n hw.ncpu 2>/dev/null)
+  echo "${n:-4}"
+}
+
+local -a job_lines
+[[ -r $jobs_file ]] && job_lines=("${(@f)$(<"$jobs_file")}")
+job_lines=("${(@)job_lines:#}")
+(( ${#job_lines} )) || exit 0
+
+local pool_size="${PROJ2Z_STATUS_JOBS:-$(_cpu_count)}"
+(( pool_size > ${#job_lines} )) && pool_size=${#job_lines}
+(( pool_size < 1 )) && pool_size=1
+
+# One "<pid> <start> <index>" file per busy worker, read by the scheduler
+local running_dir="${out_dir}/.running"
+mkdir -p "$running_dir"
+
+# Worker: handles every pool_size-th repo, one at a time
+_worker() {
+  local w=$1 k idx project_path pid
+  for (( k=w; k <= ${#job_lines}; k += pool_size )); do
+    idx="${job_lines[$k]%%$'\t'*}"
+    project_path="${job_lines[$k]#*$'\t'}"
+
+    zsh "$git_status_script" "$project_path" > "${out_dir}/${idx}" 2>/dev/null &
+    pid=$!
+    print -r -- "$pid $EPOCHREALTIME $idx" > "${running_dir}/${w}"
+    wait $pid 2>/dev/null
+    rm -f "${running_dir}/${w}"
+
+    if [[ -e "${out_dir}/${idx}.timeout" ]]; then
+      print -r -- "${idx}"$'\t'"timeout"
+    else
+      print -r -- "${idx}"$'\t'"ok"
+    fi
+  done
+}
+
+# Deadline scheduler: one poll loop for all workers (zselect sleeps without forking)
+_scheduler() {
+  local f
+  local -a job
+  while true; do
+    zselect -t 5
+    # The run was cancelled and its dir removed
+    [[ -d $running_dir ]] || return 0
+    for f in "$running_dir"/*(N); do
+      job=(${=$(<"$f")})
+      (( ${#job} == 3 )) || continue
+      (( EPOCHREALTIME - job[2] > timeout )) || continue
+      [[ -e "${out_dir}/${job[3]}.timeout" ]] && continue
+
+      # Mark before killing so the worker reports the timeout
+      : > "${out_dir}/${job[3]}.timeout"
+      (( $+commands[pkill] )) && pkill -P "${job[1]}" 2>/dev/null
+      kill "${job[1]}" 2>/dev/null
+    done
+  done
+}
+
+_scheduler &
+local scheduler_pid=$!
+
+# Cancelled (a newer CTRL-S, or proj2z exiting): take the pool down with us
+local -a worker_pids
+trap 'kill $scheduler_pid "${worker_pids[@]}" 2>/dev/null; exit 143' TERM
+
+local w
+for (( w=1; w <= pool_size; w++ )); do
+  _worker $w &
+  worker_pids+=($!)
+done
+
+wait "${worker_pids[@]}" 2>/dev/null
+kill $scheduler_pid 2>/dev/null
+rm -rf "$running_dir"
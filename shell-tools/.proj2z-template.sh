@@ -0,0 +1,218 @@
+#!/usr/bin/env zsh
+# Project templates for proj2 (sourced by proj2.zsh): p2 --new <name> --from <template>
+#
+# A template is a directory: either a path, or a name under PROJ2Z_TEMPLATES_DIR
+# (default ~/.config/proj2z/templates). Git templates are cloned without a
+# checkout, sharing the template's object store, so even a multi-GB history
+# costs a handful of hardlinks:
+#
+#   PROJ2Z_TEMPLATE_CLONE  local   hardlink the objects (git clone --local, default)
+#                          shared  borrow them through alternates (git clone --shared,
+#                                  the local form of --reference); the template
+#                                  must then never be pruned or deleted
+#
+# The template's tracked files are copied with copy-on-write clones where the
+# filesystem supports them (cp --reflink on Linux, cp -c on macOS) along with
+# its index, so nothing is re-hashed. Untracked and ignored files (.env,
+# node_modules, build output) stay behind unless PROJ2Z_TEMPLATE_COPY=all; a
+# template without git is always copied whole. The template's remote becomes
+# "template".
+#
+# {{name}}, {{path}}, {{template}}, {{user}}, {{date}} and {{year}} are
+# substituted in file contents, plus any --set key=value pairs. A
+# .proj2z-template file in the template lists the files to substitute (one
+# pattern per line, zsh globs allowed) and is removed from the new project;
+# without it every tracked text file containing "{{" is rewritten.
+
+zmodload -F zsh/datetime b:strftime p:EPOCHSECONDS 2>/dev/null
+
+# Resolve a template argument to a directory; sets REPLY
+_proj2z_template_resolve() {
+  local template="$1"
+  local templates_dir="${PROJ2Z_TEMPLATES_DIR:-${XDG_CONFIG_HOME:-$HOME/.config}/proj2z/templates}"
+  REPLY=""
+
+  if [[ -d $template ]]; then
+    REPLY="${template:A}"
+  elif [[ $template != */* && -d "${templates_dir}/${template}" ]]; then
+    REPLY="${templates_dir}/${template}"
+  else
+    echo "Error: Template not found: $template" >&2
+    local -a available
+    available=("${templates_dir}"/*(N/:t))
+    (( ${#available} )) && echo "Available templates: ${available[*]}" >&2
+    return 1
+  fi
+}
+
+# Copy files (paths relative to source_dir) into dest_dir at the same paths,
+# one cp per directory, using copy-on-write clones when possible
+# Arguments: source_dir dest_dir file...
+_proj2z_template_copy_files() {
+  local src="$1" dest="$2"
+  shift 2
+  local -A by_dir
+  local file dir
+  for file in "$@"; do
+    [[ -e "${src}/${file}" || -L "${src}/${file}" ]] || continue
+    if [[ -d "${src}/${file}" && ! -L "${src}/${file}" ]]; then
+      # Submodule: its directory only, like an uninitialized clone
+      mkdir -p "${dest}/${file}" || return 1
+      continue
+    fi
+    by_dir[${file:h}]+="${src}/${file}"$'\0'
+  done
+
+  local -a batch cow_opts
+  [[ $OSTYPE == darwin* ]] && cow_opts=(-Ppc) || cow_opts=(-Pp --reflink=auto)
+  for dir in "${(@k)by_dir}"; do
+    batch=("${(@0)by_dir[$dir]}")
+    batch=("${(@)batch:#}")
+    mkdir -p "${dest}/${dir}" || return 1
+    cp "${cow_opts[@]}" -- "${batch[@]}" "${dest}/${dir}/" 2>/dev/null \
+      || cp -Pp -- "${batch[@]}" "${dest}/${dir}/" || return 1
+  done
+}
+
+# Copy a template's files (minus .git) using copy-on-write clones when possible
+# Git templates copy only tracked files unless PROJ2Z_TEMPLATE_COPY=all
+# Arguments: source_dir dest_dir
+_proj2z_template_copy_tree() {
+  local src="$1" dest="$2"
+  if [[ -e "${src}/.git" && ${PROJ2Z_TEMPLATE_COPY:-tracked} != all ]] && (( $+commands[git] )); then
+    local -a tracked
+    tracked=("${(@0)$(git -C "$src" ls-files -z 2>/dev/null)}")
+    tracked=("${(@)tracked:#}")
+    _proj2z_template_copy_files "$src" "$dest" "${(@u)tracked}"
+    return
+  fi
+
+  local -a entries
+  entries=("${src}"/*(DN))
+  entries=("${(@)entries:#${src}/.git}")
+  (( ${#entries} )) || return 0
+
+  if [[ $OSTYPE == darwin* ]]; then
+    cp -Rpc -- "${entries[@]}" "$dest/" 2>/dev/null && return 0
+  else
+    cp -Rp --reflink=auto -- "${entries[@]}" "$dest/" 2>/dev/null && return 0
+  fi
+  # No copy-on-write support in this cp: plain copy
+  cp -Rp -- "${entries[@]}" "$dest/"
+}
+
+# Substitute {{key}} variables in the given files (relative to project_path)
+# Arguments: project_path key value [key value ...] -- file...
+_proj2z_template_substitute() {
+  local project_path="$1"
+  shift
+  local -A vars
+  while (( $# >= 2 )) && [[ $1 != "--" ]]; do
+    vars[$1]="$2"
+    shift 2
+  done
+  [[ $1 == "--" ]] && shift
+
+  local file key content
+  for file in "$@"; do
+    [[ -f "${project_path}/${file}" && ! -L "${project_path}/${file}" ]] || continue
+    content=""
+    IFS= read -r -d '' content < "${project_path}/${file}"
+    [[ $content == *"{{"* ]] || continue
+    for key in "${(@k)vars}"; do
+      content="${content//"{{${key}}}"/${vars[$key]}}"
+    done
+    print -rn -- "$content" > "${project_path}/${file}"
+  done
+}
+
+# Create a project from a template
+# Arguments: full_path template_dir [key=value ...]
+# Returns 1 (leaving nothing behind) when the clone or copy fails
+_proj2z_template_create() {
+  local full_path="$1" template_dir="$2"
+  shift 2
+  local project_name="${full_path:t}"
+
+  if ! mkdir -p "$full_path"; then
+    echo "Error: Failed to create directory: $full_path" >&2
+    return 1
+  fi
+
+  local is_git=0
+  [[ -e "${template_dir}/.git" ]] && (( $+commands[git] )) && is_git=1
+
+  if (( is_git )); then
+    local -a clone_opts
+    clone_opts=(--quiet --no-checkout)
+    if [[ ${PROJ2Z_TEMPLATE_CLONE:-local} == shared ]]; then
+      clone_opts+=(--shared)
+    else
+      clone_opts+=(--local)
+    fi
+    if ! git clone "${clone_opts[@]}" -- "$template_dir" "$full_path" &>/dev/null; then
+      echo "Error: Failed to clone template: $template_dir" >&2
+      rm -rf "$full_path"
+      return 1
+    fi
+    git -C "$full_path" remote rename origin template &>/dev/null
+  fi
+
+  if ! _proj2z_template_copy_tree "$template_dir" "$full_path"; then
+    echo "Error: Failed to copy template files: $template_dir" >&2
+    rm -rf "$full_path"
+    return 1
+  fi
+
+  # Reuse the template's index: stat data of the copies matches (cp -p), so
+  # git does not re-read every file to rebuild it. A split index can't be
+  # carried over on its own; rebuild that one from HEAD.
+  if (( is_git )) && _proj2z_git_dir "$template_dir"; then
+    local -a shared_index
+    shared_index=("${REPLY}"/sharedindex.*(N))
+    if (( ${#shared_index} )) || ! cp -p -- "${REPLY}/index" "${full_path}/.git/index" 2>/dev/null; then
+      git -C "$full_path" reset -q &>/dev/null
+    fi
+  elif (( $+commands[git] )); then
+    git -C "$full_path" init -q &>/dev/null && git -C "$full_path" add -A &>/dev/null
+  fi
+
+  # Variables
+  local -a vars
+  local pair
+  vars=(name "$project_name" path "$full_path" template "${template_dir:t}"
+    user "${USER:-$(id -un 2>/dev/null)}" date "$(strftime '%Y-%m-%d' $EPOCHSECONDS)"
+    year "$(strftime '%Y' $EPOCHSECONDS)")
+  for pair in "$@"; do
+    vars+=("${pair%%=*}" "${pair#*=}")
+  done
+
+  # Files to substitute: the manifest, or every tracked text file with a "{{"
+  local manifest="${full_path}/.proj2z-template" pattern line
+  local -a files
+  if [[ -f $manifest ]]; then
+    for line in "${(@f)$(<"$manifest")}"; do
+      [[ -z $line || $line == "#"* ]] && continue
+      pattern="$line"
+      files+=("${full_path}"/${~pattern}(N.))
+    done
+    files=("${(@)files#${full_path}/}")
+    rm -f "$manifest"
+  elif [[ -d "${full_path}/.git" ]]; then
+    files=(${(f)"$(git -C "$full_path" grep -l -I -F -e '{{' 2>/dev/null)"})
+  fi
+  _proj2z_template_substitute "$full_path" "${vars[@]}" -- "${files[@]}"
+
+  [[ -d "${full_path}/.git" ]] || return 0
+
+  # Commit the instantiated template. Copies keep their mtime and size, so
+  # comparing only those lets git skip re-reading unchanged files.
+  (( ${#files} )) && git -C "$full_path" add -- "${files[@]}" &>/dev/null
+  git -C "$full_path" rm -q --cached --ignore-unmatch -- .proj2z-template &>/dev/null
+  (( is_git )) && git -C "$full_path" diff --cached --quiet &>/dev/null && return 0
+  if ! git -C "$full_path" -c core.checkStat=minimal -c core.trustctime=false \
+      commit -q -m "Initial commit: ${project_name} from template ${template_dir:t}" &>/dev/null; then
+    echo "Warning: Failed to create initial commit" >&2
+  fi
+  return 0
+}
@@ -0,0 +1,213 @@
+#!/usr/bin/env zsh
+# Incremental disk-usage and activity index for proj2
+# Args: [project_path...] (default: every project in the proj2z index)
+#
+# Measures each project's size on disk (like du, in KiB) and its last real
+# activity: the newest file mtime outside .git, or the last HEAD move in
+# .git/logs/HEAD. proj2z starts it detached when PROJ2Z_USAGE is set; only one
+# run at a time (usage.lock in the cache dir holds the running measurer's PID).
+#
+#   PROJ2Z_USAGE_JOBS      projects measured concurrently (default 4)
+#   PROJ2Z_USAGE_INTERVAL  minimum seconds between runs (default 600)
+#   PROJ2Z_USAGE_MAX_AGE   seconds before a project is re-measured from
+#                          scratch (default 86400)
+#
+# Each project keeps a per-directory store in usage/<key>: one
+# "<dir><TAB><kib><TAB><newest>" line per directory, for that directory's own
+# files. A run only re-reads directories whose mtime moved since the last one
+# (`find -type d -newer`), plus any subdirectory it has never seen; everything
+# else is summed from the store. Files rewritten in place don't touch their
+# directory, so the periodic full measure catches those. Totals land in
+# usage.tsv as "<path><TAB><kib><TAB><activity><TAB><measured_at>".
+
+script_dir="${0:A:h}"
+source "${script_dir}/.proj2z-cache.sh"
+
+# Suppress job control
+setopt NO_NOTIFY NO_MONITOR EXTENDED_GLOB
+
+_proj2z_cache_dir
+local cache_dir="${REPLY}"
+local summary_file="${cache_dir}/usage.tsv"
+local store_dir="${cache_dir}/usage"
+local lock_dir="${cache_dir}/usage.lock"
+local -i usage_jobs="${PROJ2Z_USAGE_JOBS:-4}"
+local -i interval="${PROJ2Z_USAGE_INTERVAL:-600}"
+local -i max_age="${PROJ2Z_USAGE_MAX_AGE:-86400}"
+(( usage_jobs < 1 )) && usage_jobs=1
+
+# Throttle whole runs, then allow one at a time; the lock is only taken over
+# once its owner has exited
+local -a st
+if (( ! $# )) && zstat -A st +mtime -- "$summary_file" 2>/dev/null && (( EPOCHSECONDS - st[1] < interval )); then
+  exit 0
+fi
+mkdir -p "$store_dir"
+_proj2z_lock_acquire "$lock_dir" || exit 0
+trap "_proj2z_lock_release '$lock_dir'" EXIT
+
+# Candidate projects
+local -a projects fields
+local line
+if (( $# )); then
+  projects=("${@:A}")
+elif [[ -r "${cache_dir}/index.tsv" ]]; then
+  for line in "${(@f)$(<"${cache_dir}/index.tsv")}"; do
+    [[ $line == "#"* || -z $line ]] && continue
+    projects+=("${line%%$'\t'*}")
+  done
+fi
+(( ${#projects} )) || exit 0
+
+local out_dir="${lock_dir}/results"
+mkdir -p "$out_dir"
+
+# Measure one project, reusing its store for unchanged directories
+# Prints "<path><TAB><kib><TAB><activity>"
+_measure_one() {
+  local project_path="$1"
+  [[ -d $project_path ]] || return 1
+  _proj2z_cache_key "$project_path"
+  local store="${store_dir}/${REPLY}"
+  local stamp="${store}.stamp"
+
+  # Stamp before walking, so changes made during the walk count next run
+  : > "${stamp}.$$"
+
+  local -A dir_kib dir_newest seen info
+  local -a queue entry_fields
+  local line rel full_at=0
+  if [[ -r $store && -e $stamp ]]; then
+    for line in "${(@f)$(<"$store")}"; do
+      entry_fields=("${(@ps:\t:)line}")
+      if [[ ${entry_fields[1]} == "#full" ]]; then
+        full_at="${entry_fields[2]}"
+      elif [[ -n ${entry_fields[1]} ]]; then
+        dir_kib[${entry_fields[1]}]="${entry_fields[2]}"
+        dir_newest[${entry_fields[1]}]="${entry_fields[3]}"
+      fi
+    done
+  fi
+
+  if (( EPOCHSECONDS - full_at >= max_age )); then
+    # From scratch: start at the root and let the walk find everything
+    dir_kib=()
+    dir_newest=()
+    full_at=$EPOCHSECONDS
+    queue=(.)
+  else
+    for line in "${(@f)$(find "$project_path" -type d -newer "$stamp" 2>/dev/null)}"; do
+      [[ -z $line ]] && continue
+      [[ $line == "$project_path" ]] && rel=. || rel="${line#${project_path}/}"
+      queue+=("$rel")
+    done
+  fi
+
+  # Re-read each changed directory's own entries; unseen subdirectories are
+  # queued, and subdirectories that vanished are dropped with their subtree
+  local dir dir_path entry child
+  local -i k=1 blocks newest stored
+  local -a entries gone
+  local -A present
+  while (( k <= ${#queue} )); do
+    dir="${queue[$k]}"
+    (( ++k ))
+    [[ -n ${seen[$dir]} ]] && continue
+    seen[$dir]=1
+    [[ $dir == . ]] && dir_path="$project_path" || dir_path="${project_path}/${dir}"
+    if [[ ! -d $dir_path ]]; then
+      gone+=("$dir")
+      continue
+    fi
+
+    stored=${+dir_kib[$dir]}
+    blocks=0
+    newest=0
+    present=()
+    entries=("${dir_path}"/*(DN))
+    for entry in "${entries[@]}"; do
+      zstat -H info -L -- "$entry" 2>/dev/null || continue
+      if (( (info[mode] & 8#170000) == 8#040000 )); then
+        [[ $dir == . ]] && child="${entry:t}" || child="${dir}/${entry:t}"
+        present[$child]=1
+        [[ -z ${dir_kib[$child]} ]] && queue+=("$child")
+      else
+        (( blocks += info[blocks] ))
+        # .git internals churn on every status; HEAD moves are counted below
+        if [[ $dir != (.git|.git/*) ]] && (( info[mtime] > newest )); then
+          newest=${info[mtime]}
+        fi
+      fi
+    done
+    dir_kib[$dir]=$(( blocks / 2 ))
+    dir_newest[$dir]=$newest
+
+    # Stored children no longer on disk (only a directory we had before can have any)
+    (( stored )) || continue
+    for child in "${(@k)dir_kib}"; do
+      [[ $child != "$dir" && ${child:h} == "$dir" && -z ${present[$child]} ]] && gone+=("$child")
+    done
+  done
+
+  for dir in "${gone[@]}"; do
+    for child in "${(@k)dir_kib}"; do
+      [[ $child == "$dir" || $child == "${dir}/"* ]] || continue
+      unset "dir_kib[$child]" "dir_newest[$child]"
+    done
+  done
+
+  # Totals, and the rewritten store
+  local -i total=0 activity=0
+  local -a store_lines
+  store_lines=("#full"$'\t'"${full_at}")
+  for dir in "${(@k)dir_kib}"; do
+    (( total += dir_kib[$dir] ))
+    (( dir_newest[$dir] > activity )) && activity=${dir_newest[$dir]}
+    store_lines+=("${dir}"$'\t'"${dir_kib[$dir]}"$'\t'"${dir_newest[$dir]}")
+  done
+  if _proj2z_git_dir "$project_path" && zstat -A st +mtime -- "${REPLY}/logs/HEAD" 2>/dev/null; then
+    (( st[1] > activity )) && activity=${st[1]}
+  fi
+
+  print -rl -- "${store_lines[@]}" > "${store}.$$" && mv -f "${store}.$$" "$store"
+  mv -f "${stamp}.$$" "$stamp"
+  print -r -- "${project_path}"$'\t'"${total}"$'\t'"${activity}"
+}
+
+# Worker: handles every usage_jobs-th project
+_worker() {
+  local w=$1 k
+  for (( k=w; k <= ${#projects}; k += usage_jobs )); do
+    _measure_one "${projects[$k]}" >> "${out_dir}/${w}"
+  done
+}
+
+local -a worker_pids
+local -i w
+for (( w=1; w <= usage_jobs && w <= ${#projects}; w++ )); do
+  _worker $w &
+  worker_pids+=($!)
+done
+wait "${worker_pids[@]}" 2>/dev/null
+
+# Fold results into the summary (single writer); keep earlier entries for
+# projects that still exist but weren't part of this run
+local -A summary
+if [[ -r $summary_file ]]; then
+  for line in "${(@f)$(<"$summary_file")}"; do
+    [[ -n $line && -d ${line%%$'\t'*} ]] && summary[${line%%$'\t'*}]="${line#*$'\t'}"
+  done
+fi
+local result_file
+for result_file in "$out_dir"/*(N); do
+  for line in "${(@f)$(<"$result_file")}"; do
+    [[ -n $line ]] && summary[${line%%$'\t'*}]="${line#*$'\t'}"$'\t'"${EPOCHSECONDS}"
+  done
+done
+
+local -a summary_lines
+local project_path
+for project_path in "${(@k)summary}"; do
+  summary_lines+=("${project_path}"$'\t'"${summary[$project_path]}")
+done
+print -rl -- "${summary_lines[@]}" > "${summary_file}.$$" && mv -f "${summary_file}.$$" "$summary_file"
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Latency benchmarks for proj2 (p2z).
+
+Generates synthetic PROJECTS_DIRS layouts (100 / 1k / 10k projects by default)
+with a mix of plain directories, clean git repos, dirty git repos and a few
+deliberately slow repos, then measures what the user actually waits for:
+
+  first_render   proj2z invocation until the initial list is on screen
+                 (cold = empty cache, warm = index already built)
+  keystroke      one filter reload per typed character, per match mode
+  ctrl_s         CTRL-S status loader until every row has its final status:
+                 the non-streaming loader runs the full pass in the foreground,
+                 so this covers untracked scans and counts timeouts as final
+                 (cold = empty status cache, warm = second press)
+  preview        one preview per row for the first rows in the list
+                 (cold = first visit, warm = revisiting the same rows)
+
+proj2z runs unmodified against a measuring stand-in for fzf: the stand-in runs
+the exact reload/preview commands proj2z hands to fzf (start, change, ctrl-s,
+--preview) and records how long each one takes, then exits without a selection.
+Streaming CTRL-S needs a live fzf --listen server, so the stand-in reports an
+fzf version without --listen and the loader uses its foreground path.
+
+Results are written as JSON so runs can be compared across commits:
+
+    ./benchmark.py --sizes 100,1000 --output before.json
+    ./benchmark.py --sizes 100,1000 --output after.json --compare before.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shlex
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+SCRIPT_DIR = Path(__file__).resolve().parents[2]
+QUERY = "service api"
+PREVIEW_ROWS = 20
+
+# Stand-in for fzf: replays proj2z's bind/preview commands and times them
+FZF_STANDIN = r'''#!/usr/bin/env python3
+import json, os, shlex, subprocess, sys, time
+
+args = sys.argv[1:]
+if "--version" in args:
+    print("0.44.0 (benchmark)")
+    sys.exit(0)
+
+binds, preview = {}, None
+for i, arg in enumerate(args):
+    value = args[i + 1] if i + 1 < len(args) else ""
+    if arg == "--bind":
+        event, _, action = value.partition(":")
+        binds[event] = action.partition(":")[2]
+    elif arg.startswith("--preview="):
+        preview = arg[len("--preview="):]
+
+def run(cmd, query="", row=""):
+    cmd = cmd.replace("{q}", shlex.quote(query)).replace("{}", shlex.quote(row))
+    start = time.time()
+    out = subprocess.run(["sh", "-c", cmd], capture_output=True, text=True).stdout
+    return time.time() - start, out.splitlines()
+
+timings = {}
+elapsed, rows = run(binds["start"])
+timings["first_render"] = time.time() - float(os.environ["PROJ2Z_BENCH_T0"])
+timings["rows"] = len(rows)
+
+query = os.environ["PROJ2Z_BENCH_QUERY"]
+timings["keystroke"] = [run(binds["change"], query[:n])[0] for n in range(1, len(query) + 1)]
+
+if os.environ.get("PROJ2Z_BENCH_CTRL_S"):
+    timings["ctrl_s"] = [run(binds["ctrl-s"])[0] for _ in range(2)]
+
+rows = rows[:int(os.environ["PROJ2Z_BENCH_PREVIEW_ROWS"])]
+timings["preview"] = [[run(preview, row=row)[0] for row in rows] for _ in range(2)]
+
+with open(os.environ["PROJ2Z_BENCH_OUT"], "w") as fh:
+    json.dump(timings, fh)
+'''
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+
+
+def make_template_repo(base: Path) -> Path:
+    """Create one committed repo that every synthetic git project is copied from."""
+    template = base / "template-repo"
+    template.mkdir(parents=True)
+    _git(template, "init")
+    _git(template, "config", "user.name", "Bench User")
+    _git(template, "config", "user.email", "bench@example.com")
+    (template / "README.md").write_text("# bench\n")
+    (template / "main.py").write_text("print('bench')\n")
+    _git(template, "add", ".")
+    _git(template, "commit", "-m", "Initial commit")
+    return template
+
+
+def generate_tree(base: Path, size: int, git_ratio: float, dirty_ratio: float, slow: int,
+                  slow_seconds: float) -> Dict[str, int]:
+    """Generate `size` projects split over two roots; returns the mix that was built."""
+    roots = [base / "projects1", base / "projects2"]
+    for root in roots:
+        root.mkdir(parents=True)
+    template = make_template_repo(base)
+
+    # A fsmonitor hook that sleeps makes every `git status` in that repo slow
+    slow_hook = base / "slow-fsmonitor.sh"
+    slow_hook.write_text(f"#!/bin/sh\nsleep {slow_seconds}\nexit 1\n")
+    slow_hook.chmod(0o755)
+
+    git_every = max(1, round(1 / git_ratio)) if git_ratio > 0 else 0
+    counts = {"projects": size, "git": 0, "dirty": 0, "slow": 0}
+    for n in range(size):
+        project = roots[n % len(roots)] / f"service-{n}-{'api' if n % 3 else 'web'}"
+        if git_every and n % git_every == 0:
+            shutil.copytree(template, project, symlinks=True)
+            counts["git"] += 1
+            if counts["slow"] < slow:
+                _git(project, "config", "core.fsmonitor", str(slow_hook))
+                counts["slow"] += 1
+            elif (counts["git"] * dirty_ratio) >= counts["dirty"] + 1:
+                (project / "main.py").write_text("print('dirty')\n")
+                (project / "scratch.txt").write_text("untracked\n")
+                counts["dirty"] += 1
+        else:
+            project.mkdir()
+            (project / "notes.txt").write_text("plain\n")
+    return counts
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Median / p95 / max of a list of durations, in milliseconds."""
+    if not samples:
+        return {}
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    return {
+        "median_ms": round(statistics.median(ordered) * 1000, 2),
+        "p95_ms": round(p95 * 1000, 2),
+        "max_ms": round(ordered[-1] * 1000, 2),
+    }
+
+
+def run_proj2z(base: Path, cache_dir: Path, bin_dir: Path, env_extra: Dict[str, str]) -> Dict:
+    """Run proj2z once against the fzf stand-in and return its timings."""
+    out_file = base / "timings.json"
+    env = {
+        **os.environ,
+        "PATH": f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}",
+        "PROJ2Z_CACHE_DIR": str(cache_dir),
+        "PROJ2Z_BENCH_OUT": str(out_file),
+        "PROJ2Z_BENCH_QUERY": QUERY,
+        "PROJ2Z_BENCH_PREVIEW_ROWS": str(PREVIEW_ROWS),
+        **env_extra,
+    }
+    env.pop("FZF_PORT", None)
+    env.pop("TMUX", None)
+    roots = " ".join(shlex.quote(str(base / r)) for r in ("projects1", "projects2"))
+    script = f"source {shlex.quote(str(SCRIPT_DIR / 'proj2.zsh'))}; PROJECTS_DIRS=({roots}); proj2z"
+
+    env["PROJ2Z_BENCH_T0"] = repr(time.time())
+    subprocess.run(["zsh", "-f", "-c", script], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return json.loads(out_file.read_text())
+
+
+def bench_size(size: int, args: argparse.Namespace) -> Dict:
+    """Build one synthetic tree and measure every latency for it."""
+    base = Path(tempfile.mkdtemp(prefix=f"proj2-bench-{size}-"))
+    try:
+        counts = generate_tree(base, size, args.git_ratio, args.dirty_ratio, args.slow, args.slow_seconds)
+        bin_dir = base / "bin"
+        bin_dir.mkdir()
+        standin = bin_dir / "fzf"
+        standin.write_text(FZF_STANDIN)
+        standin.chmod(0o755)
+        cache_dir = base / "cache"
+
+        result = {"size": size, "mix": counts}
+        cold = run_proj2z(base, cache_dir, bin_dir, {"PROJ2Z_BENCH_CTRL_S": "1"})
+        warm = run_proj2z(base, cache_dir, bin_dir, {"PROJ2Z_MATCH_MODE": "rank"})
+
+        result["rows"] = cold["rows"]
+        result["first_render"] = {
+            "cold_ms": round(cold["first_render"] * 1000, 2),
+            "warm_ms": round(warm["first_render"] * 1000, 2),
+        }
+        result["keystroke"] = {
+            "substring": summarize(cold["keystroke"]),
+            "rank": summarize(warm["keystroke"]),
+        }
+        result["ctrl_s"] = {
+            "cold_ms": round(cold["ctrl_s"][0] * 1000, 2),
+            "warm_ms": round(cold["ctrl_s"][1] * 1000, 2),
+        }
+        result["preview"] = {
+            "cold": summarize(cold["preview"][0]),
+            "warm": summarize(cold["preview"][1]),
+        }
+        return result
+    finally:
+        if args.keep:
+            print(f"Kept synthetic tree: {base}", file=sys.stderr)
+        else:
+            shutil.rmtree(base, ignore_errors=True)
+
+
+def _git_head() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=SCRIPT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _flatten(prefix: str, value, out: Dict[str, float]) -> Dict[str, float]:
+    if isinstance(value, dict):
+        for k, v in value.items():
+            _flatten(f"{prefix}.{k}" if prefix else k, v, out)
+    elif isinstance(value, (int, float)) and prefix.endswith("_ms"):
+        out[prefix] = value
+    return out
+
+
+def compare(current: Dict, baseline: Dict) -> None:
+    """Print per-metric deltas against a previous results file."""
+    old_by_size = {r["size"]: r for r in baseline.get("results", [])}
+    print(f"Compared with {baseline.get('commit', '?')[:12]}:")
+    for result in current["results"]:
+        old = old_by_size.get(result["size"])
+        if old is None:
+            continue
+        new_metrics, old_metrics = _flatten("", result, {}), _flatten("", old, {})
+        for name, value in new_metrics.items():
+            if name in old_metrics and old_metrics[name]:
+                delta = (value - old_metrics[name]) / old_metrics[name] * 100
+                print(f"  {result['size']:>6} {name:<28} {old_metrics[name]:>10.2f} -> {value:>10.2f} ms ({delta:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark proj2 latency on synthetic project trees")
+    parser.add_argument("--sizes", default="100,1000,10000", help="Comma-separated project counts")
+    parser.add_argument("--git-ratio", type=float, default=0.25, help="Fraction of projects that are git repos")
+    parser.add_argument("--dirty-ratio", type=float, default=0.3, help="Fraction of git repos with local changes")
+    parser.add_argument("--slow", type=int, default=3, help="Number of deliberately slow repos")
+    parser.add_argument("--slow-seconds", type=float, default=2.0, help="Extra git status time per slow repo")
+    parser.add_argument("--output", default="proj2-bench.json", help="JSON results file")
+    parser.add_argument("--compare", help="Previous results file to print deltas against")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated trees")
+    args = parser.parse_args()
+
+    for tool in ("zsh", "git"):
+        if shutil.which(tool) is None:
+            print(f"Error: {tool} is required", file=sys.stderr)
+            return 1
+
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        print(f"Benchmarking {size} projects...", file=sys.stderr)
+        results.append(bench_size(size, args))
+
+    report = {
+        "commit": _git_head(),
+        "timestamp": int(time.time()),
+        "platform": platform.platform(),
+        "query": QUERY,
+        "results": results,
+    }
+    Path(args.output).write_text(json.dumps(report, indent=2) + "\n")
+    print(f"Wrote {args.output}", file=sys.stderr)
+
+    if args.compare:
+        compare(report, json.loads(Path(args.compare).read_text()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -251,6 +251,24 @@ def load_status_script(proj2_script_dir: Path) -> Path:
     return proj2_script_dir / ".proj2z-load-status.sh"
 
 
+@pytest.fixture
+def status_engine_script(proj2_script_dir: Path) -> Path:
+    """Get path to the worker-pool status engine script."""
+    return proj2_script_dir / ".proj2z-status-engine.sh"
+
+
+@pytest.fixture
+def fetch_script(proj2_script_dir: Path) -> Path:
+    """Get path to the background fetch scheduler script."""
+    return proj2_script_dir / ".proj2z-fetch.sh"
+
+
+@pytest.fixture
+def usage_script(proj2_script_dir: Path) -> Path:
+    """Get path to the background disk-usage index script."""
+    return proj2_script_dir / ".proj2z-usage.sh"
+
+
 @pytest.fixture
 def fzf_installed() -> bool:
     """Check if fzf is installed."""
@@ -5,7 +5,9 @@ These tests verify the behavior of the proj2 project navigation command
 by running actual shell commands in tmux sessions and verifying outcomes.
 """
 
+import json
 import os
+import shutil
 import subprocess
 import tempfile
 from pathlib import Path
@@ -15,6 +17,20 @@ import pytest
 from ptytest import TmuxSession, Keys
 
 
+def run_load_status(load_status_script: Path, proj2_script_dir: Path, cache_dir: Path, project: Path,
+                    env: dict = None) -> subprocess.CompletedProcess:
+    """Run the CTRL-S status loader for a single project with an isolated cache."""
+    data_file = cache_dir.parent / "project-data.tsv"
+    data_file.write_text(f"{project}\tprojects/{project.name}\t0\t0\t1\n")
+    base_env = {k: v for k, v in os.environ.items() if k not in ("FZF_PORT", "PROJ2Z_NO_REVALIDATE")}
+    return subprocess.run(
+        ["zsh", str(load_status_script), "", str(data_file), str(proj2_script_dir)],
+        capture_output=True,
+        text=True,
+        env={**base_env, "PROJ2Z_CACHE_DIR": str(cache_dir), **(env or {})}
+    )
+
+
 class TestProj2Basics:
     """Test basic proj2 functionality."""
 
@@ -262,6 +278,800 @@ echo "$result"
             os.unlink(test_script_path.name)
 
 
+class TestStatusStyling:
+    """Test both status call sites keep their exact p10k styling on top of the shared collector."""
+
+    RESET = "\x1b[0m"
+    BOLD = "\x1b[1m"
+    UL = "\x1b[4m"
+    META = "\x1b[38;5;246m"
+    CLEAN = "\x1b[38;5;76m"
+    STAGED = "\x1b[38;5;40m"
+    UNSTAGED = "\x1b[38;5;160m"
+    AHEAD = "\x1b[38;5;39m"
+    REMOTE = "\x1b[38;5;28m"
+
+    def _function_output(self, proj2_script_dir: Path, project: Path) -> str:
+        return subprocess.run(
+            ["zsh", "-c", f'source "{proj2_script_dir / "proj2.zsh"}"; _proj2z_git_status "{project}"'],
+            capture_output=True,
+            text=True
+        ).stdout
+
+    def _script_output(self, git_status_script: Path, project: Path) -> str:
+        return subprocess.run(
+            ["zsh", str(git_status_script), str(project)],
+            capture_output=True,
+            text=True
+        ).stdout
+
+    def _branch(self, project: Path) -> str:
+        return subprocess.run(["git", "branch", "--show-current"], cwd=project,
+                              capture_output=True, text=True).stdout.strip()
+
+    def _sut(self) -> str:
+        return f" {self.BOLD}{self.STAGED}S{self.UNSTAGED}U{self.META}T{self.RESET}"
+
+    def _make_dirty(self, project: Path) -> None:
+        (project / "staged.txt").write_text("staged\n")
+        subprocess.run(["git", "add", "staged.txt"], cwd=project, check=True)
+        (project / "README.md").write_text("# Modified\n")
+        (project / "untracked.txt").write_text("untracked\n")
+
+    def test_no_remote_styling(self, proj2_script_dir: Path, git_status_script: Path, sample_project: Path):
+        """Test clean and dirty repos without a remote render exactly as before."""
+        branch = self._branch(sample_project)
+        head = f"{self.CLEAN}{branch}{self.RESET} {self.META}[{self.REMOTE}"
+        age = f" {self.META}0m{self.RESET}\n"
+
+        assert self._function_output(proj2_script_dir, sample_project) == \
+            f"{head}{self.META}(none){self.META}]{self.RESET}{age}"
+        assert self._script_output(git_status_script, sample_project) == \
+            f"{head}{self.META}local{self.META}]{self.RESET}{age}"
+
+        self._make_dirty(sample_project)
+
+        # The function only shows SUT flags next to a remote; the script always does
+        assert self._function_output(proj2_script_dir, sample_project) == \
+            f"{head}{self.META}(none){self.META}]{self.RESET}{age}"
+        assert self._script_output(git_status_script, sample_project) == \
+            f"{head}{self.META}local{self._sut()}{self.META}]{self.RESET}{age}"
+
+    def test_remote_ahead_styling(self, proj2_script_dir: Path, git_status_script: Path,
+                                  sample_project: Path, temp_dir: Path):
+        """Test a dirty repo ahead of its upstream renders identically at both call sites."""
+        branch = self._branch(sample_project)
+        remote = temp_dir / "remote.git"
+        subprocess.run(["git", "clone", "--bare", str(sample_project), str(remote)], capture_output=True, check=True)
+        for cmd in (["remote", "add", "origin", str(remote)], ["fetch", "origin"],
+                    ["branch", "-u", f"origin/{branch}"], ["commit", "--allow-empty", "-m", "ahead"]):
+            subprocess.run(["git", *cmd], cwd=sample_project, capture_output=True, check=True)
+        self._make_dirty(sample_project)
+
+        expected = (f"{self.BOLD}{self.AHEAD}+{self.UL}1{self.RESET} "
+                    f"{self.CLEAN}{branch}{self.RESET} {self.META}[{self.REMOTE}origin/{branch}"
+                    f"{self._sut()}{self.META}]{self.RESET} {self.META}0m{self.RESET}\n")
+
+        assert self._function_output(proj2_script_dir, sample_project) == expected
+        assert self._script_output(git_status_script, sample_project) == expected
+
+    def test_linked_worktree_has_status(self, proj2_script_dir: Path, sample_project: Path, temp_dir: Path):
+        """Test a linked worktree (.git file) gets a status like any other repo."""
+        worktree = temp_dir / "linked"
+        subprocess.run(["git", "worktree", "add", "-q", "-b", "linked", str(worktree)], cwd=sample_project,
+                       capture_output=True, check=True)
+
+        assert f"{self.CLEAN}linked{self.RESET}" in self._function_output(proj2_script_dir, worktree)
+
+    def test_local_upstream_styling(self, proj2_script_dir: Path, git_status_script: Path, sample_project: Path):
+        """Test an upstream on another local branch renders as ./<branch>, as before."""
+        branch = self._branch(sample_project)
+        for cmd in (["checkout", "-q", "-b", "topic"], ["branch", "-u", branch]):
+            subprocess.run(["git", *cmd], cwd=sample_project, capture_output=True, check=True)
+
+        expected = (f"{self.CLEAN}topic{self.RESET} {self.META}[{self.REMOTE}./{branch}"
+                    f"{self.META}]{self.RESET} {self.META}0m{self.RESET}\n")
+
+        assert self._function_output(proj2_script_dir, sample_project) == expected
+        assert self._script_output(git_status_script, sample_project) == expected
+
+
+class TestProjectIndex:
+    """Test the persistent project index (_proj2z_index_refresh)."""
+
+    def _refresh(self, script_path: Path, cache_dir: Path, projects_dir: Path, env=None) -> subprocess.CompletedProcess:
+        test_script_path = tempfile.NamedTemporaryFile(mode='w', suffix='.zsh', delete=False)
+
+        with test_script_path:
+            test_script_path.write(f"""#!/bin/zsh
+set -eo pipefail
+
+source "{script_path}"
+export PROJ2Z_CACHE_DIR="{cache_dir}"
+_proj2z_index_refresh "{projects_dir}"
+print -rl -- "${{reply[@]}}"
+""")
+
+        try:
+            return subprocess.run(
+                ["zsh", str(test_script_path.name)],
+                capture_output=True,
+                text=True,
+                env={**os.environ, **(env or {})}
+            )
+        finally:
+            os.unlink(test_script_path.name)
+
+    def test_index_records_projects(self, proj2_script_dir: Path, temp_dir: Path, projects_dir: Path):
+        """Test index records path, display, mtime, has_git and root per project."""
+        (projects_dir / "plain-project").mkdir()
+        (projects_dir / "git-project" / ".git").mkdir(parents=True)
+
+        result = self._refresh(proj2_script_dir / "proj2.zsh", temp_dir / "cache", projects_dir)
+
+        assert result.returncode == 0
+        records = {line.split("\t")[0]: line.split("\t") for line in result.stdout.splitlines()}
+        plain = records[str(projects_dir / "plain-project")]
+        git = records[str(projects_dir / "git-project")]
+
+        assert plain[1] == "projects/plain-project"
+        assert int(plain[2]) > 0  # real mtime, not the old `stat -f` fallback of 0
+        assert plain[3] == "0"
+        assert git[3] == "1"
+        assert git[4] == str(projects_dir)
+        assert (temp_dir / "cache" / "index.tsv").exists()
+
+    def test_index_picks_up_new_and_removed_projects(self, proj2_script_dir: Path, temp_dir: Path, projects_dir: Path):
+        """Test a changed root mtime invalidates the cached entry list."""
+        script_path = proj2_script_dir / "proj2.zsh"
+        cache_dir = temp_dir / "cache"
+        (projects_dir / "old-project").mkdir()
+
+        first = self._refresh(script_path, cache_dir, projects_dir)
+        assert "old-project" in first.stdout
+
+        (projects_dir / "old-project").rmdir()
+        (projects_dir / "new-project").mkdir()
+        # Force a visible root mtime change even on coarse-grained filesystems
+        os.utime(projects_dir, (time.time() + 5, time.time() + 5))
+
+        second = self._refresh(script_path, cache_dir, projects_dir)
+        assert second.returncode == 0
+        assert "new-project" in second.stdout
+        assert "old-project" not in second.stdout
+
+
+    def test_nested_discovery(self, proj2_script_dir: Path, temp_dir: Path, projects_dir: Path):
+        """Test depth>1 discovery finds .git dirs and files, prunes projects and skips heavy dirs."""
+        (projects_dir / "org" / "repo" / ".git").mkdir(parents=True)
+        (projects_dir / "org" / "worktree").mkdir(parents=True)
+        (projects_dir / "org" / "worktree" / ".git").write_text("gitdir: /elsewhere\n")
+        (projects_dir / "mono" / ".git").mkdir(parents=True)
+        (projects_dir / "mono" / "packages" / "inner" / ".git").mkdir(parents=True)
+        (projects_dir / "node_modules" / "dep" / ".git").mkdir(parents=True)
+
+        result = self._refresh(proj2_script_dir / "proj2.zsh", temp_dir / "cache", projects_dir,
+                               env={"PROJ2Z_DISCOVERY_DEPTH": "3"})
+
+        assert result.returncode == 0
+        displays = sorted(line.split("\t")[1] for line in result.stdout.splitlines())
+        assert displays == ["projects/mono", "projects/org/repo", "projects/org/worktree"]
+
+    def test_nested_discovery_notices_new_project(self, proj2_script_dir: Path, temp_dir: Path, projects_dir: Path):
+        """Test a project added below an intermediate directory triggers a rescan."""
+        script_path = proj2_script_dir / "proj2.zsh"
+        cache_dir = temp_dir / "cache"
+        env = {"PROJ2Z_DISCOVERY_DEPTH": "2"}
+        (projects_dir / "org" / "repo" / ".git").mkdir(parents=True)
+
+        first = self._refresh(script_path, cache_dir, projects_dir, env=env)
+        assert "projects/org/repo" in first.stdout
+
+        (projects_dir / "org" / "other" / ".git").mkdir(parents=True)
+        os.utime(projects_dir / "org", (time.time() + 5, time.time() + 5))
+
+        second = self._refresh(script_path, cache_dir, projects_dir, env=env)
+        assert "projects/org/other" in second.stdout
+
+
+class TestFrecency:
+    """Test the selection log and decayed frecency table."""
+
+    def _run(self, script_path: Path, cache_dir: Path, body: str, env=None) -> subprocess.CompletedProcess:
+        test_script_path = tempfile.NamedTemporaryFile(mode='w', suffix='.zsh', delete=False)
+
+        with test_script_path:
+            test_script_path.write(f"""#!/bin/zsh
+source "{script_path}"
+export PROJ2Z_CACHE_DIR="{cache_dir}"
+{body}
+""")
+
+        try:
+            return subprocess.run(
+                ["zsh", str(test_script_path.name)],
+                capture_output=True,
+                text=True,
+                env={**os.environ, **(env or {})}
+            )
+        finally:
+            os.unlink(test_script_path.name)
+
+    def test_selections_rank_by_frecency(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test more frequent selections score higher."""
+        result = self._run(proj2_script_dir / "proj2.zsh", temp_dir / "cache", """
+_proj2z_frecency_record /p/often cd
+_proj2z_frecency_record /p/often cd
+_proj2z_frecency_record /p/rare github
+_proj2z_frecency_load
+local -A scores
+scores=("${reply[@]}")
+(( ${scores[/p/often]} > ${scores[/p/rare]} )) && print ordered
+""")
+
+        assert result.returncode == 0
+        assert "ordered" in result.stdout
+        log = (temp_dir / "cache" / "frecency.log").read_text().splitlines()
+        assert [line.split("\t")[1:] for line in log] == [
+            ["cd", "/p/often"], ["cd", "/p/often"], ["github", "/p/rare"]
+        ]
+
+    def test_log_compacts_into_decayed_table(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test the log is folded into the table once it outgrows its budget."""
+        cache_dir = temp_dir / "cache"
+        cache_dir.mkdir()
+        # A selection a year old decays away; a recent one survives
+        (cache_dir / "frecency.log").write_text(f"{int(time.time()) - 31536000}\tcd\t/p/ancient\n")
+
+        result = self._run(proj2_script_dir / "proj2.zsh", cache_dir, """
+for n in {1..20}; do _proj2z_frecency_record /p/recent cd; done
+""", env={"PROJ2Z_FRECENCY_LOG_MAX": "200"})
+
+        assert result.returncode == 0
+        assert (cache_dir / "frecency.log").stat().st_size <= 200
+        table = (cache_dir / "frecency.tsv").read_text()
+        assert "/p/recent" in table
+        assert "/p/ancient" not in table
+
+
+class TestStatusCache:
+    """Test the fingerprint-keyed git status cache used by CTRL-S."""
+
+    def _run_zsh(self, body: str, env: dict = None) -> subprocess.CompletedProcess:
+        test_script_path = tempfile.NamedTemporaryFile(mode='w', suffix='.zsh', delete=False)
+        with test_script_path:
+            test_script_path.write("#!/bin/zsh\n" + body)
+        try:
+            return subprocess.run(
+                ["zsh", str(test_script_path.name)],
+                capture_output=True,
+                text=True,
+                env={**os.environ, **(env or {})}
+            )
+        finally:
+            os.unlink(test_script_path.name)
+
+    def _fingerprint(self, proj2_script_dir: Path, project: Path) -> str:
+        result = self._run_zsh(f"""
+source "{proj2_script_dir}/.proj2z-cache.sh"
+_proj2z_git_fingerprint "{project}" && print -r -- "$REPLY"
+""")
+        assert result.returncode == 0
+        return result.stdout.strip()
+
+    def _write_entry(self, cache_dir: Path, project: Path, fingerprint: str, status: str):
+        status_dir = cache_dir / "status"
+        status_dir.mkdir(parents=True, exist_ok=True)
+        key = str(project).replace("/", "%")
+        (status_dir / key).write_text(f"{fingerprint}\n{int(time.time())}\n{status}\n")
+
+    def test_fingerprint_moves_on_commit(self, proj2_script_dir: Path, sample_project: Path):
+        """Test the fingerprint changes when HEAD's ref and index change."""
+        before = self._fingerprint(proj2_script_dir, sample_project)
+        assert before
+
+        time.sleep(1.1)  # mtimes have one-second resolution
+        (sample_project / "new.txt").write_text("new\n")
+        subprocess.run(["git", "add", "new.txt"], cwd=sample_project, check=True, capture_output=True)
+        subprocess.run(["git", "commit", "-m", "add new"], cwd=sample_project, check=True, capture_output=True)
+
+        assert self._fingerprint(proj2_script_dir, sample_project) != before
+
+    def test_fresh_entry_served_from_cache(self, load_status_script: Path, proj2_script_dir: Path,
+                                           sample_project: Path, temp_dir: Path):
+        """Test a matching fingerprint is served from cache without a stale marker."""
+        cache_dir = temp_dir / "cache"
+        self._write_entry(cache_dir, sample_project, self._fingerprint(proj2_script_dir, sample_project), "CACHED-STATUS")
+
+        result = run_load_status(load_status_script, proj2_script_dir, cache_dir, sample_project)
+
+        assert result.returncode == 0
+        assert "CACHED-STATUS" in result.stdout
+        assert "↻" not in result.stdout
+
+    def test_moved_fingerprint_rendered_stale(self, load_status_script: Path, proj2_script_dir: Path,
+                                              sample_project: Path, temp_dir: Path):
+        """Test a moved fingerprint still renders the cached row, marked stale."""
+        cache_dir = temp_dir / "cache"
+        self._write_entry(cache_dir, sample_project, "0:0:0:0", "OLD-STATUS")
+
+        result = run_load_status(load_status_script, proj2_script_dir, cache_dir, sample_project)
+
+        assert result.returncode == 0
+        assert "OLD-STATUS" in result.stdout
+        assert "↻" in result.stdout
+
+    def test_cache_miss_computes_and_seeds_cache(self, load_status_script: Path, proj2_script_dir: Path,
+                                                 sample_project: Path, temp_dir: Path):
+        """Test an uncached repo gets a full pass in the foreground that seeds the cache."""
+        cache_dir = temp_dir / "cache"
+
+        result = run_load_status(load_status_script, proj2_script_dir, cache_dir, sample_project,
+                                 env={"PROJ2Z_STATUS_TIMEOUT": "5"})
+
+        assert result.returncode == 0
+        assert "master" in result.stdout or "main" in result.stdout
+        assert "…" not in result.stdout  # final without a push channel
+        assert len(list((cache_dir / "status").iterdir())) == 1
+
+    def test_cache_miss_timeout_marked(self, load_status_script: Path, proj2_script_dir: Path,
+                                       sample_project: Path, temp_dir: Path):
+        """Test a foreground timeout shows as timed out rather than pending."""
+        fake_script_dir = temp_dir / "fake-scripts"
+        fake_script_dir.mkdir()
+        for script in proj2_script_dir.glob(".proj2z-*.sh"):
+            shutil.copy(script, fake_script_dir)
+        (fake_script_dir / ".proj2z-git-status.sh").write_text("sleep 10\n")
+
+        result = run_load_status(load_status_script, fake_script_dir, temp_dir / "cache", sample_project,
+                                 env={"PROJ2Z_STATUS_TIMEOUT": "0.2", "PROJ2Z_STREAM_TIMEOUT": "0.2"})
+
+        assert result.returncode == 0
+        assert "timed out" in result.stdout
+        assert "…" not in result.stdout
+
+
+class TestStreamingLoad:
+    """Test streaming CTRL-S loads (rows first, statuses pushed in later)."""
+
+    def test_streaming_prints_placeholders_immediately(self, load_status_script: Path, proj2_script_dir: Path,
+                                                       sample_project: Path, temp_dir: Path):
+        """Test uncached repos get a placeholder row and are filled in from the background."""
+        if shutil.which("curl") is None:
+            pytest.skip("curl not installed")
+
+        cache_dir = temp_dir / "cache"
+        # Nothing listens on the port: pushes fail silently, the cache still fills
+        result = run_load_status(load_status_script, proj2_script_dir, cache_dir, sample_project,
+                                         env={"FZF_PORT": "1"})
+
+        assert result.returncode == 0
+        assert "sample-project" in result.stdout
+        assert "…" in result.stdout
+
+        status_dir = cache_dir / "status"
+        deadline = time.time() + 10
+        while time.time() < deadline and not (status_dir.exists() and any(status_dir.iterdir())):
+            time.sleep(0.1)
+        assert any(status_dir.iterdir())
+
+    def test_render_only_reports_timeouts(self, load_status_script: Path, proj2_script_dir: Path,
+                                          sample_project: Path, temp_dir: Path):
+        """Test a render-only reload shows repos the running engine timed out."""
+        cache_dir = temp_dir / "cache"
+        live_dir = temp_dir / "project-data.tsv.status"
+        live_dir.mkdir(parents=True)
+        (live_dir / "1.timeout").touch()
+
+        result = run_load_status(load_status_script, proj2_script_dir, cache_dir, sample_project,
+                                         env={"PROJ2Z_NO_REVALIDATE": "1"})
+
+        assert result.returncode == 0
+        assert "timed out" in result.stdout
+
+
+    def test_new_run_cancels_previous_refresh(self, load_status_script: Path, proj2_script_dir: Path,
+                                              sample_project: Path, temp_dir: Path):
+        """Test a new CTRL-S stops the previous run's background refresh before reusing its dir."""
+        live_dir = temp_dir / "project-data.tsv.status"
+        live_dir.mkdir(parents=True)
+        previous = subprocess.Popen(["sleep", "30"])
+        (live_dir / "pid").write_text(f"{previous.pid}\n")
+        (live_dir / "1.timeout").touch()
+
+        try:
+            result = run_load_status(load_status_script, proj2_script_dir, temp_dir / "cache", sample_project,
+                                     env={"PROJ2Z_STATUS_TIMEOUT": "5"})
+            assert result.returncode == 0
+            assert previous.wait(timeout=5) != 0
+            assert not (live_dir / "1.timeout").exists()
+        finally:
+            previous.kill()
+
+
+class TestProgressiveStatus:
+    """Test the two-pass (fast, then untracked) status refresh."""
+
+    def test_fast_pass_skips_untracked(self, git_status_script: Path, sample_project: Path):
+        """Test PROJ2Z_STATUS_UNTRACKED=no drops the untracked scan only."""
+        (sample_project / "untracked.txt").write_text("new\n")
+        (sample_project / "README.md").write_text("# Modified\n")
+
+        def fields(extra_env):
+            return subprocess.run(
+                ["zsh", str(git_status_script), str(sample_project)],
+                capture_output=True,
+                text=True,
+                env={**os.environ, "PROJ2Z_STATUS_FIELDS": "1", **extra_env}
+            ).stdout.strip().split("\t")
+
+        full = fields({})
+        fast = fields({"PROJ2Z_STATUS_UNTRACKED": "no"})
+
+        assert full[4:6] == ["1", "1"]  # unstaged, untracked
+        assert fast[4:6] == ["1", "0"]
+
+    def test_render_only_shows_fast_result_until_full_pass(self, load_status_script: Path, proj2_script_dir: Path,
+                                                           sample_project: Path, temp_dir: Path):
+        """Test a fast-pass row is marked pending, and final once the full pass gives up."""
+        cache_dir = temp_dir / "cache"
+        fast_dir = temp_dir / "project-data.tsv.status" / "fast"
+        fast_dir.mkdir(parents=True)
+        (fast_dir / "1").write_text("FAST-STATUS\n")
+        env = {"PROJ2Z_NO_REVALIDATE": "1"}
+
+        pending = run_load_status(load_status_script, proj2_script_dir, cache_dir, sample_project, env=env)
+        assert "FAST-STATUS" in pending.stdout
+        assert "…" in pending.stdout
+
+        (fast_dir.parent / "1.timeout").touch()
+        final = run_load_status(load_status_script, proj2_script_dir, cache_dir, sample_project, env=env)
+        assert "FAST-STATUS" in final.stdout
+        assert "…" not in final.stdout
+        assert "timed out" not in final.stdout
+
+    def test_large_repo_opts_into_untracked_cache(self, git_status_script: Path, sample_project: Path):
+        """Test PROJ2Z_TUNE_LARGE_REPOS enables core.untrackedCache once the index is large."""
+        subprocess.run(
+            ["zsh", str(git_status_script), str(sample_project)],
+            capture_output=True,
+            env={**os.environ, "PROJ2Z_TUNE_LARGE_REPOS": "1", "PROJ2Z_LARGE_REPO_INDEX_BYTES": "1"}
+        )
+
+        value = subprocess.run(["git", "config", "core.untrackedCache"], cwd=sample_project,
+                               capture_output=True, text=True).stdout.strip()
+        assert value == "true"
+
+
+class TestStatusEngine:
+    """Test the bounded worker-pool status engine (.proj2z-status-engine.sh)."""
+
+    def _run_engine(self, engine: Path, jobs: List[Path], out_dir: Path, script_dir: Path,
+                    timeout: str = "0.5", pool: str = "2") -> subprocess.CompletedProcess:
+        out_dir.mkdir(parents=True, exist_ok=True)
+        jobs_file = out_dir / "jobs"
+        jobs_file.write_text("".join(f"{i}\t{p}\n" for i, p in enumerate(jobs, start=1)))
+        return subprocess.run(
+            ["zsh", str(engine), str(jobs_file), str(out_dir), str(script_dir), timeout],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_STATUS_JOBS": pool},
+            timeout=30
+        )
+
+    def test_engine_reports_every_repo(self, status_engine_script: Path, proj2_script_dir: Path,
+                                       multiple_projects: List[Path], temp_dir: Path):
+        """Test each repo gets a result file and an 'ok' event with a small pool."""
+        out_dir = temp_dir / "out"
+        result = self._run_engine(status_engine_script, multiple_projects, out_dir, proj2_script_dir, timeout="5")
+
+        assert result.returncode == 0
+        events = dict(line.split("\t") for line in result.stdout.splitlines())
+        assert events == {str(i): "ok" for i in range(1, len(multiple_projects) + 1)}
+        for i in range(1, len(multiple_projects) + 1):
+            content = (out_dir / str(i)).read_text()
+            assert "master" in content or "main" in content
+        assert not (out_dir / ".running").exists()
+
+    def test_engine_reports_timeouts(self, status_engine_script: Path, multiple_projects: List[Path], temp_dir: Path):
+        """Test slow repos are reported as timed out instead of stalling the pool."""
+        fake_script_dir = temp_dir / "fake-scripts"
+        fake_script_dir.mkdir()
+        (fake_script_dir / ".proj2z-git-status.sh").write_text("sleep 10\n")
+
+        start = time.time()
+        result = self._run_engine(status_engine_script, multiple_projects[:2], temp_dir / "out",
+                                  fake_script_dir, timeout="0.3", pool="1")
+        elapsed = time.time() - start
+
+        assert result.returncode == 0
+        events = dict(line.split("\t") for line in result.stdout.splitlines())
+        assert events == {"1": "timeout", "2": "timeout"}
+        # Two serial 0.3s budgets, nowhere near the 10s sleep
+        assert elapsed < 5
+
+
+class TestFetchScheduler:
+    """Test the background fetch scheduler (.proj2z-fetch.sh) against local bare remotes."""
+
+    def _clone_with_upstream_commit(self, sample_project: Path, temp_dir: Path, name: str) -> Path:
+        """Clone sample_project through a bare remote, then push a commit the clone hasn't fetched."""
+        remote = temp_dir / f"{name}.git"
+        clone = temp_dir / name
+        other = temp_dir / f"{name}-other"
+        subprocess.run(["git", "clone", "--bare", str(sample_project), str(remote)], capture_output=True, check=True)
+        subprocess.run(["git", "clone", str(remote), str(clone)], capture_output=True, check=True)
+        subprocess.run(["git", "clone", str(remote), str(other)], capture_output=True, check=True)
+        for cmd in (["-c", "user.name=T", "-c", "user.email=t@e", "commit", "--allow-empty", "-m", "upstream"], ["push"]):
+            subprocess.run(["git", *cmd], cwd=other, capture_output=True, check=True)
+        return clone
+
+    def _fetch(self, fetch_script: Path, cache_dir: Path, *projects: Path, env=None) -> subprocess.CompletedProcess:
+        return subprocess.run(
+            ["zsh", str(fetch_script), *map(str, projects)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_CACHE_DIR": str(cache_dir), **(env or {})}
+        )
+
+    def _state(self, cache_dir: Path) -> dict:
+        lines = (cache_dir / "fetch-state.tsv").read_text().splitlines()
+        return {f[0]: f[1:] for f in (line.split("\t") for line in lines)}
+
+    def test_fetch_updates_behind_count(self, fetch_script: Path, sample_project: Path, temp_dir: Path):
+        """Test a due repo is fetched, so behind counts reflect the remote."""
+        clone = self._clone_with_upstream_commit(sample_project, temp_dir, "clone")
+        cache_dir = temp_dir / "cache"
+
+        result = self._fetch(fetch_script, cache_dir, clone)
+
+        assert result.returncode == 0
+        behind = subprocess.run(["git", "rev-list", "--count", "HEAD..@{upstream}"], cwd=clone,
+                                capture_output=True, text=True).stdout.strip()
+        assert behind == "1"
+        last_success, failures, next_allowed = self._state(cache_dir)[str(clone)]
+        assert failures == "0"
+        assert int(next_allowed) >= int(last_success) + 3600
+        assert not (cache_dir / "fetch.lock").exists()
+
+    def test_fetch_respects_min_interval(self, fetch_script: Path, sample_project: Path, temp_dir: Path):
+        """Test a repo fetched recently is skipped until its interval passes."""
+        clone = self._clone_with_upstream_commit(sample_project, temp_dir, "clone")
+        cache_dir = temp_dir / "cache"
+        self._fetch(fetch_script, cache_dir, clone)
+        fetch_head = clone / ".git" / "FETCH_HEAD"
+        os.utime(fetch_head, (1, 1))
+
+        self._fetch(fetch_script, cache_dir, clone)
+
+        assert fetch_head.stat().st_mtime == 1
+
+    def test_failed_fetch_backs_off(self, fetch_script: Path, sample_project: Path, temp_dir: Path):
+        """Test a failing remote is retried only after an exponential backoff."""
+        clone = self._clone_with_upstream_commit(sample_project, temp_dir, "clone")
+        shutil.rmtree(temp_dir / "clone.git")
+        cache_dir = temp_dir / "cache"
+        env = {"PROJ2Z_FETCH_INTERVAL": "100", "PROJ2Z_FETCH_MAX_BACKOFF": "100000"}
+
+        self._fetch(fetch_script, cache_dir, clone, env=env)
+        _, failures, first_next = self._state(cache_dir)[str(clone)]
+        assert failures == "1"
+        assert int(first_next) - int(time.time()) > 150  # 100 * 2^1, not the plain interval
+
+    def test_lock_taken_over_only_from_dead_owner(self, fetch_script: Path, sample_project: Path, temp_dir: Path):
+        """Test a live scheduler's lock is left alone however old, and a dead one's is reclaimed."""
+        clone = self._clone_with_upstream_commit(sample_project, temp_dir, "clone")
+        cache_dir = temp_dir / "cache"
+        lock_dir = cache_dir / "fetch.lock"
+        lock_dir.mkdir(parents=True)
+        (lock_dir / "pid").write_text(f"{os.getpid()}\n")
+        os.utime(lock_dir, (1, 1))
+
+        self._fetch(fetch_script, cache_dir, clone)
+        assert not (cache_dir / "fetch-state.tsv").exists()
+        assert lock_dir.exists()
+
+        dead = subprocess.Popen(["true"])
+        dead.wait()
+        (lock_dir / "pid").write_text(f"{dead.pid}\n")
+        self._fetch(fetch_script, cache_dir, clone)
+        assert str(clone) in self._state(cache_dir)
+        assert not lock_dir.exists()
+
+    def test_state_drops_removed_projects(self, fetch_script: Path, sample_project: Path, temp_dir: Path):
+        """Test fetch-state.tsv forgets projects that no longer exist."""
+        clone = self._clone_with_upstream_commit(sample_project, temp_dir, "clone")
+        cache_dir = temp_dir / "cache"
+        cache_dir.mkdir()
+        gone = temp_dir / "gone"
+        (cache_dir / "fetch-state.tsv").write_text(f"{gone}\t1\t0\t1\n")
+
+        self._fetch(fetch_script, cache_dir, clone)
+
+        assert list(self._state(cache_dir)) == [str(clone)]
+
+
+class TestUsageIndex:
+    """Test the incremental disk-usage and activity index (.proj2z-usage.sh)."""
+
+    def _measure(self, usage_script: Path, cache_dir: Path, *projects: Path, env=None) -> dict:
+        result = subprocess.run(
+            ["zsh", str(usage_script), *map(str, projects)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_CACHE_DIR": str(cache_dir), **(env or {})}
+        )
+        assert result.returncode == 0, result.stderr
+        lines = (cache_dir / "usage.tsv").read_text().splitlines()
+        return {f[0]: (int(f[1]), int(f[2])) for f in (line.split("\t") for line in lines)}
+
+    def test_measures_size_and_activity(self, usage_script: Path, sample_project: Path, temp_dir: Path):
+        """Test a project's size and newest file mtime land in usage.tsv."""
+        (sample_project / "data").mkdir()
+        blob = sample_project / "data" / "blob.bin"
+        blob.write_bytes(os.urandom(256 * 1024))
+        os.utime(blob, (2000000000, 2000000000))
+
+        usage = self._measure(usage_script, temp_dir / "cache", sample_project)
+
+        kib, activity = usage[str(sample_project)]
+        assert kib >= 256
+        assert activity == 2000000000
+        assert not (temp_dir / "cache" / "usage.lock").exists()
+
+    def test_live_lock_is_never_taken_over(self, usage_script: Path, sample_project: Path, temp_dir: Path):
+        """Test a running measurer keeps its lock past the throttle interval."""
+        cache_dir = temp_dir / "cache"
+        lock_dir = cache_dir / "usage.lock"
+        lock_dir.mkdir(parents=True)
+        (lock_dir / "pid").write_text(f"{os.getpid()}\n")
+        os.utime(lock_dir, (1, 1))
+
+        subprocess.run(["zsh", str(usage_script), str(sample_project)], capture_output=True,
+                       env={**os.environ, "PROJ2Z_CACHE_DIR": str(cache_dir)})
+
+        assert (lock_dir / "pid").read_text().strip() == str(os.getpid())
+        assert not (cache_dir / "usage.tsv").exists()
+
+    def test_remeasures_only_changed_directories(self, usage_script: Path, sample_project: Path,
+                                                  temp_dir: Path):
+        """Test an incremental run picks up new and removed directories from the store."""
+        cache_dir = temp_dir / "cache"
+        (sample_project / "keep").mkdir()
+        (sample_project / "keep" / "a.bin").write_bytes(os.urandom(64 * 1024))
+        (sample_project / "gone").mkdir()
+        (sample_project / "gone" / "b.bin").write_bytes(os.urandom(64 * 1024))
+        first, _ = self._measure(usage_script, cache_dir, sample_project)[str(sample_project)]
+
+        # Tamper with the stored size of an unchanged directory: an incremental
+        # run must reuse it rather than re-read the directory
+        store = next(f for f in (cache_dir / "usage").iterdir() if not f.name.endswith(".stamp"))
+        lines = store.read_text().splitlines()
+        store.write_text("\n".join(
+            "keep\t1000\t" + line.split("\t")[2] if line.startswith("keep\t") else line for line in lines) + "\n")
+        time.sleep(1.1)
+        shutil.rmtree(sample_project / "gone")
+        (sample_project / "new").mkdir()
+        (sample_project / "new" / "c.bin").write_bytes(os.urandom(128 * 1024))
+
+        second, _ = self._measure(usage_script, cache_dir, sample_project)[str(sample_project)]
+
+        stored_dirs = {line.split("\t")[0] for line in store.read_text().splitlines()}
+        assert "gone" not in stored_dirs
+        assert "new" in stored_dirs
+        assert second >= first - 64 + 128 + (1000 - 64) - 8
+
+        # A full re-measure corrects the tampered entry
+        third, _ = self._measure(usage_script, cache_dir, sample_project,
+                                 env={"PROJ2Z_USAGE_MAX_AGE": "0"})[str(sample_project)]
+        assert third < second
+
+    def test_list_usage_columns_sorted_by_size(self, proj2_script_dir: Path, temp_dir: Path,
+                                               multiple_projects: List[Path],
+                                               multiple_projects_dirs: List[Path]):
+        """Test --list --usage --sort=size appends the usage columns in size order."""
+        cache_dir = temp_dir / "cache"
+        cache_dir.mkdir()
+        sizes = {str(p): (n + 1) * 100 for n, p in enumerate(multiple_projects)}
+        (cache_dir / "usage.tsv").write_text(
+            "".join(f"{p}\t{kib}\t1700000000\t{int(time.time())}\n" for p, kib in sizes.items()))
+        dirs = " ".join(f'"{d}"' for d in multiple_projects_dirs)
+
+        result = subprocess.run(
+            ["zsh", "-c", f'source "{proj2_script_dir / "proj2.zsh"}"; PROJECTS_DIRS=({dirs}); '
+                          'proj2z --list --usage --sort=size'],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_CACHE_DIR": str(cache_dir), "PROJ2Z_USAGE_INTERVAL": "3600"}
+        )
+
+        assert result.returncode == 0
+        rows = [line.split("\t") for line in result.stdout.splitlines()]
+        assert all(len(r) == 14 for r in rows)
+        assert [int(r[12]) for r in rows] == sorted(sizes.values(), reverse=True)
+        assert all(r[13] == "1700000000" for r in rows)
+
+
+class TestListMode:
+    """Test non-interactive listing (proj2z --list)."""
+
+    def _list(self, proj2_script_dir: Path, cache_dir: Path, roots: List[Path], *args: str) -> subprocess.CompletedProcess:
+        dirs = " ".join(f'"{d}"' for d in roots)
+        return subprocess.run(
+            ["zsh", "-c", f'source "{proj2_script_dir / "proj2.zsh"}"; PROJECTS_DIRS=({dirs}); proj2z --list {" ".join(args)}'],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_CACHE_DIR": str(cache_dir)}
+        )
+
+    def test_list_tsv(self, proj2_script_dir: Path, temp_dir: Path, multiple_projects: List[Path],
+                      multiple_projects_dirs: List[Path]):
+        """Test --list prints one TSV record per project without needing fzf."""
+        result = self._list(proj2_script_dir, temp_dir / "cache", multiple_projects_dirs)
+
+        assert result.returncode == 0
+        rows = [line.split("\t") for line in result.stdout.splitlines()]
+        assert sorted(r[0] for r in rows) == sorted(str(p) for p in multiple_projects)
+        assert all(len(r) == 12 for r in rows)
+        assert all(r[4] == "" for r in rows)  # no git columns without --status
+
+    def test_list_status_json(self, proj2_script_dir: Path, temp_dir: Path, sample_project: Path):
+        """Test --list --status --format=json reports git fields, then serves them from cache."""
+        (sample_project / "new.txt").write_text("untracked\n")
+        cache_dir = temp_dir / "cache"
+
+        first = self._list(proj2_script_dir, cache_dir, [sample_project.parent], "--status", "--format=json")
+
+        assert first.returncode == 0
+        records = {r["path"]: r for r in map(json.loads, first.stdout.splitlines())}
+        record = records[str(sample_project)]
+        assert record["display"].endswith("/sample-project")
+        assert record["active"] is False
+        assert record["branch"]
+        assert record["untracked"] == 1
+        assert record["ahead"] == 0
+        assert record["last_commit_age"] >= 0
+        assert (cache_dir / "status-fields").is_dir()
+
+        second = self._list(proj2_script_dir, cache_dir, [sample_project.parent], "--status", "--format=json")
+        cached = {r["path"]: r for r in map(json.loads, second.stdout.splitlines())}[str(sample_project)]
+        assert {k: v for k, v in cached.items() if k != "last_commit_age"} == \
+            {k: v for k, v in record.items() if k != "last_commit_age"}
+
+    def test_list_rejects_unknown_option(self, proj2_script_dir: Path, temp_dir: Path, projects_dir: Path):
+        """Test --list fails on an unknown option."""
+        result = self._list(proj2_script_dir, temp_dir / "cache", [projects_dir], "--format=xml")
+
+        assert result.returncode == 1
+        assert "Unknown --list option" in result.stderr
+
+
+class TestBenchmark:
+    """Smoke test for the latency benchmark harness (benchmark.py)."""
+
+    @pytest.mark.slow
+    @pytest.mark.fzf
+    def test_benchmark_writes_json_report(self, temp_dir: Path):
+        """Test a tiny benchmark run produces every metric."""
+        output = temp_dir / "bench.json"
+        result = subprocess.run(
+            ["python3", str(Path(__file__).parent / "benchmark.py"), "--sizes", "20",
+             "--slow", "1", "--slow-seconds", "0.2", "--output", str(output)],
+            capture_output=True,
+            text=True
+        )
+
+        assert result.returncode == 0, result.stderr
+        report = json.loads(output.read_text())
+        run = report["results"][0]
+        assert run["size"] == 20
+        assert run["rows"] == 20
+        assert {"cold_ms", "warm_ms"} <= set(run["first_render"])
+        assert {"substring", "rank"} == set(run["keystroke"])
+        assert {"cold_ms", "warm_ms"} <= set(run["ctrl_s"])
+        assert run["preview"]["cold"]["median_ms"] > 0
+
+
 class TestProjectValidation:
     """Test project name validation."""
 
@@ -389,6 +1199,13 @@ fi
             os.unlink(test_script_path.name)
 
 
+# The template's repo config is not cloned, so commits need an identity from the environment
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "Test User", "GIT_AUTHOR_EMAIL": "test@example.com",
+    "GIT_COMMITTER_NAME": "Test User", "GIT_COMMITTER_EMAIL": "test@example.com",
+}
+
+
 class TestProjectCreation:
     """Test new project creation."""
 
@@ -488,6 +1305,135 @@ _proj2z_handle_new_project_noninteractive "existing"
             os.unlink(test_script_path.name)
 
 
+    def _make_template(self, temp_dir: Path) -> Path:
+        template = temp_dir / "templates" / "svc"
+        template.mkdir(parents=True)
+        subprocess.run(["git", "init", "-q"], cwd=template, check=True)
+        subprocess.run(["git", "config", "user.email", "test@example.com"], cwd=template, check=True)
+        subprocess.run(["git", "config", "user.name", "Test User"], cwd=template, check=True)
+        (template / "README.md").write_text("# {{name}}\nOwner: {{owner}}\n")
+        (template / "main.py").write_text("print('static')\n")
+        subprocess.run(["git", "add", "."], cwd=template, check=True)
+        subprocess.run(["git", "commit", "-q", "-m", "Template"], cwd=template, check=True)
+        return template
+
+    def _new_from(self, script_path: Path, projects_dir: Path, args: str, env=None) -> subprocess.CompletedProcess:
+        test_script_path = tempfile.NamedTemporaryFile(mode='w', suffix='.zsh', delete=False)
+
+        with test_script_path:
+            test_script_path.write(f"""#!/bin/zsh
+source "{script_path}"
+unset PROJECTS_DIRS
+export PROJECTS_DIR="{projects_dir}"
+proj2z --new {args}
+""")
+
+        try:
+            return subprocess.run(
+                ["zsh", str(test_script_path.name)],
+                capture_output=True,
+                text=True,
+                env={**os.environ, **GIT_IDENTITY, **(env or {})}
+            )
+        finally:
+            os.unlink(test_script_path.name)
+
+    def test_create_project_from_template(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test p2 --new <name> --from <template> clones and substitutes variables."""
+        template = self._make_template(temp_dir)
+        projects_dir = temp_dir / "projects"
+        projects_dir.mkdir()
+
+        result = self._new_from(proj2_script_dir / "proj2.zsh", projects_dir,
+                                "my-svc --from svc --set owner=platform",
+                                env={"PROJ2Z_TEMPLATES_DIR": str(template.parent)})
+
+        assert result.returncode == 0, result.stderr
+        proj_path = projects_dir / "my-svc"
+        assert (proj_path / "README.md").read_text() == "# my-svc\nOwner: platform\n"
+        assert (proj_path / "main.py").read_text() == "print('static')\n"
+
+        git = lambda *a: subprocess.run(["git", *a], cwd=proj_path, capture_output=True, text=True).stdout
+        assert git("status", "--porcelain") == ""
+        assert git("remote").split() == ["template"]
+        assert len(git("log", "--format=%s").splitlines()) == 2
+        # Objects are hardlinked from the template, not copied
+        pack_objects = [p for p in (proj_path / ".git" / "objects").rglob("*") if p.is_file()]
+        assert any(p.stat().st_nlink > 1 for p in pack_objects)
+
+    def test_create_project_from_template_manifest(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test a .proj2z-template manifest limits substitution and is dropped."""
+        template = self._make_template(temp_dir)
+        (template / "docs").mkdir()
+        (template / "docs" / "index.md").write_text("{{name}} docs\n")
+        (template / ".proj2z-template").write_text("docs/*.md\n")
+        subprocess.run(["git", "add", "."], cwd=template, check=True)
+        subprocess.run(["git", "commit", "-q", "-m", "Manifest"], cwd=template, check=True)
+        projects_dir = temp_dir / "projects"
+        projects_dir.mkdir()
+
+        result = self._new_from(proj2_script_dir / "proj2.zsh", projects_dir, f"docs-svc --from={template}")
+
+        assert result.returncode == 0, result.stderr
+        proj_path = projects_dir / "docs-svc"
+        assert (proj_path / "docs" / "index.md").read_text() == "docs-svc docs\n"
+        assert (proj_path / "README.md").read_text().startswith("# {{name}}")
+        assert not (proj_path / ".proj2z-template").exists()
+        tracked = subprocess.run(["git", "ls-files"], cwd=proj_path, capture_output=True, text=True).stdout
+        assert ".proj2z-template" not in tracked
+
+    def test_create_project_from_template_skips_untracked(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test only tracked template files are copied unless PROJ2Z_TEMPLATE_COPY=all."""
+        template = self._make_template(temp_dir)
+        (template / ".gitignore").write_text(".env\nnode_modules/\n")
+        subprocess.run(["git", "add", ".gitignore"], cwd=template, check=True)
+        subprocess.run(["git", "commit", "-q", "-m", "Ignore"], cwd=template, check=True)
+        (template / ".env").write_text("SECRET=1\n")
+        (template / "node_modules").mkdir()
+        (template / "node_modules" / "dep.js").write_text("x\n")
+        (template / "scratch.txt").write_text("wip\n")
+        projects_dir = temp_dir / "projects"
+        projects_dir.mkdir()
+
+        result = self._new_from(proj2_script_dir / "proj2.zsh", projects_dir, f"clean-svc --from={template}")
+
+        assert result.returncode == 0, result.stderr
+        proj_path = projects_dir / "clean-svc"
+        assert (proj_path / "main.py").exists()
+        assert (proj_path / ".gitignore").exists()
+        for name in (".env", "node_modules", "scratch.txt"):
+            assert not (proj_path / name).exists()
+
+        result = self._new_from(proj2_script_dir / "proj2.zsh", projects_dir, f"full-svc --from={template}",
+                                env={"PROJ2Z_TEMPLATE_COPY": "all"})
+        assert result.returncode == 0, result.stderr
+        assert (projects_dir / "full-svc" / ".env").exists()
+
+    def test_create_project_from_without_template_fails(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test --from with no value is rejected instead of creating a plain project."""
+        projects_dir = temp_dir / "projects"
+        projects_dir.mkdir()
+
+        for args in ("x --from", "x --from=", "x --from --set a=b"):
+            result = self._new_from(proj2_script_dir / "proj2.zsh", projects_dir, args)
+
+            assert result.returncode != 0
+            assert "--from expects a template" in result.stderr
+            assert not (projects_dir / "x").exists()
+
+    def test_create_project_unknown_template_fails(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test an unknown template fails before anything is created."""
+        projects_dir = temp_dir / "projects"
+        projects_dir.mkdir()
+
+        result = self._new_from(proj2_script_dir / "proj2.zsh", projects_dir, "x --from nope",
+                                env={"PROJ2Z_TEMPLATES_DIR": str(temp_dir / "templates")})
+
+        assert result.returncode != 0
+        assert "Template not found" in result.stderr
+        assert not (projects_dir / "x").exists()
+
+
 class TestFilterScript:
     """Test the filter script (.proj2z-filter.sh)."""
 
@@ -570,6 +1516,77 @@ class TestFilterScript:
             os.unlink(inactive_file.name)
 
 
+    @pytest.mark.fzf
+    def test_filter_script_precomputed_keys(self, filter_script: Path, temp_dir: Path):
+        """Test key<TAB>row input matches on the key and prints only the row."""
+        active_file = temp_dir / "active"
+        inactive_file = temp_dir / "inactive"
+        active_file.write_text("")
+        inactive_file.write_text(
+            "projects2/project-gamma\tprojects2/\x1b[1mproject-gamma\x1b[0m\n"
+            "projects2/project-delta\tprojects2/project-delta\n"
+        )
+
+        result = subprocess.run(
+            ["zsh", str(filter_script), "GAMMA", str(active_file), str(inactive_file)],
+            capture_output=True,
+            text=True
+        )
+
+        assert result.returncode == 0
+        assert result.stdout == "projects2/\x1b[1mproject-gamma\x1b[0m\n"
+
+    @pytest.mark.fzf
+    def test_filter_script_rank_mode(self, filter_script: Path, temp_dir: Path):
+        """Test rank mode orders by fuzzy score but keeps active sessions first."""
+        active_file = temp_dir / "active"
+        inactive_file = temp_dir / "inactive"
+        active_file.write_text("● projects2/toolsmith\n")
+        inactive_file.write_text("projects1/alpha-tools\nprojects1/unrelated\nprojects1/tools\n")
+
+        result = subprocess.run(
+            ["zsh", str(filter_script), "tools", str(active_file), str(inactive_file)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_MATCH_MODE": "rank"}
+        )
+
+        assert result.returncode == 0
+        assert result.stdout.splitlines() == [
+            "● projects2/toolsmith",
+            "projects1/tools",
+            "projects1/alpha-tools",
+        ]
+
+    @pytest.mark.fzf
+    @pytest.mark.parametrize("mode,budget", [("substring", 0.5), ("rank", 1.5)])
+    def test_filter_keystroke_latency_budget(self, filter_script: Path, temp_dir: Path, mode: str, budget: float):
+        """Test one keystroke over 1000 projects stays inside the latency budget."""
+        active_file = temp_dir / "active"
+        inactive_file = temp_dir / "inactive"
+        active_file.write_text("".join(f"projects1/active-{i}\t● projects1/active-{i}\n" for i in range(50)))
+        inactive_file.write_text("".join(
+            f"projects2/service-{i}-api\tprojects2/service-{i}-api  \x1b[38;5;76mmain\x1b[0m\n" for i in range(950)
+        ))
+
+        # Timed inside zsh so interpreter startup (which varies a lot across
+        # machines) stays out of the budget; PROJ2Z_TEST_TIME_SCALE stretches
+        # it on slow CI runners
+        timer = ('zmodload zsh/datetime; float start=$EPOCHREALTIME; source "$@"; '
+                 'print -u2 -r -- "elapsed $(( EPOCHREALTIME - start ))"')
+        result = subprocess.run(
+            ["zsh", "-c", timer, "zsh", str(filter_script), "svc api", str(active_file), str(inactive_file)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_MATCH_MODE": mode}
+        )
+        budget *= float(os.environ.get("PROJ2Z_TEST_TIME_SCALE", "1"))
+
+        assert result.returncode == 0
+        elapsed = float(result.stderr.split("elapsed ")[-1])
+        assert elapsed < budget, f"{mode} filter took {elapsed:.3f}s (budget {budget:.2f}s)"
+
+
 class TestPreviewScript:
     """Test the preview script (.proj2z-preview.sh)."""
 
@@ -620,6 +1637,67 @@ class TestPreviewScript:
         # The script should run successfully (may or may not find the project depending on timing)
         # Just verify it doesn't crash
 
+    @pytest.mark.fzf
+    def test_preview_cached_until_fingerprint_moves(self, preview_script: Path, sample_project: Path, temp_dir: Path):
+        """Test revisiting a row is served from the preview cache, with opt-in tracing."""
+        trace_file = temp_dir / "trace.log"
+        env = {**os.environ, "PROJ2Z_CACHE_DIR": str(temp_dir / "cache"),
+               "PROJ2Z_TRACE": "1", "PROJ2Z_TRACE_FILE": str(trace_file)}
+        args = ["zsh", str(preview_script), "sample-project", str(sample_project.parent)]
+
+        first = subprocess.run(args, capture_output=True, text=True, env=env)
+        second = subprocess.run(args, capture_output=True, text=True, env=env)
+
+        assert first.returncode == 0
+        assert second.stdout == first.stdout
+        phases = [line.split()[1] for line in trace_file.read_text().splitlines()]
+        assert phases.count("git") == 1
+        assert phases.count("cache-hit") == 1
+
+        subprocess.run(["git", "commit", "--allow-empty", "-m", "move"], cwd=sample_project, capture_output=True)
+        os.utime(sample_project / ".git" / "HEAD", (time.time() + 5, time.time() + 5))
+        subprocess.run(args, capture_output=True, text=True, env=env)
+        phases = [line.split()[1] for line in trace_file.read_text().splitlines()]
+        assert phases.count("git") == 2
+
+    @pytest.mark.fzf
+    def test_preview_reads_tmux_snapshot(self, preview_script: Path, sample_project: Path, temp_dir: Path):
+        """Test the preview takes session info from proj2z's snapshot instead of querying tmux."""
+        cache_dir = temp_dir / "cache"
+        cache_dir.mkdir()
+        created = int(time.time()) - 7200
+        (cache_dir / "tmux-sessions.tsv").write_text(
+            f"sample-project\t{created}\t1\t2\t{sample_project}\n"
+        )
+
+        result = subprocess.run(
+            ["zsh", str(preview_script), "sample-project", str(sample_project.parent)],
+            capture_output=True,
+            text=True,
+            env={**os.environ, "PROJ2Z_CACHE_DIR": str(cache_dir)}
+        )
+
+        assert result.returncode == 0
+        assert "Tmux Session: sample-project" in result.stdout
+        assert "Alive for: 2h" in result.stdout
+        assert "Windows: 2 (attached)" in result.stdout
+
+    @pytest.mark.fzf
+    def test_preview_trace_off_by_default(self, preview_script: Path, sample_project: Path, temp_dir: Path):
+        """Test no trace output is written unless PROJ2Z_TRACE is set."""
+        env = {k: v for k, v in os.environ.items() if k != "PROJ2Z_TRACE"}
+        env["PROJ2Z_CACHE_DIR"] = str(temp_dir / "cache")
+
+        result = subprocess.run(
+            ["zsh", str(preview_script), "sample-project", str(sample_project.parent)],
+            capture_output=True,
+            text=True,
+            env=env
+        )
+
+        assert result.returncode == 0
+        assert not (temp_dir / "cache" / "trace.log").exists()
+
 
 class TestTmuxIntegration:
     """Test tmux session integration."""
@@ -693,6 +1771,69 @@ fi
         finally:
             os.unlink(test_script_path.name)
 
+    def test_prewarm_creates_each_session_name_once(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test prewarm skips projects whose basename already has a session in the batch."""
+        for parent in ("a", "b"):
+            (temp_dir / parent / "same").mkdir(parents=True)
+        (temp_dir / "a" / "other").mkdir()
+        script_path = proj2_script_dir / "proj2.zsh"
+        test_script_path = tempfile.NamedTemporaryFile(mode='w', suffix='.zsh', delete=False)
+
+        with test_script_path:
+            test_script_path.write(f"""#!/bin/zsh
+source "{script_path}"
+export PROJ2Z_CACHE_DIR="{temp_dir / 'cache'}"
+export PROJ2Z_PREWARM=2
+commands[tmux]=/bin/true
+tmux() {{ [[ $1 == list-sessions ]] || print -r -- "$*" }}
+_proj2z_prewarm "{temp_dir}/a/same" "{temp_dir}/b/same" "{temp_dir}/a/other"
+""")
+
+        try:
+            result = subprocess.run(
+                ["zsh", str(test_script_path.name)],
+                capture_output=True,
+                text=True
+            )
+
+            assert result.returncode == 0
+            assert result.stdout.count("new-session -d -s same ") == 1
+            assert "new-session -d -s other " in result.stdout
+        finally:
+            os.unlink(test_script_path.name)
+
+    def test_tmux_conf_sourced_only_when_changed(self, proj2_script_dir: Path, temp_dir: Path):
+        """Test the tmux config counts as changed until stamped, and again after its mtime moves."""
+        conf = temp_dir / "tmux.conf"
+        conf.write_text("set -g mouse on\n")
+        script_path = proj2_script_dir / "proj2.zsh"
+        test_script_path = tempfile.NamedTemporaryFile(mode='w', suffix='.zsh', delete=False)
+
+        with test_script_path:
+            test_script_path.write(f"""#!/bin/zsh
+source "{script_path}"
+export PROJ2Z_CACHE_DIR="{temp_dir / 'cache'}"
+export PROJ2Z_TMUX_CONF="{conf}"
+_proj2z_tmux_conf_changed && print first
+_proj2z_tmux_conf_changed && print unstamped
+_proj2z_tmux_conf_stamp "$REPLY"
+_proj2z_tmux_conf_changed && print second
+touch -d '+1 minute' "{conf}"
+_proj2z_tmux_conf_changed && print third
+""")
+
+        try:
+            result = subprocess.run(
+                ["zsh", str(test_script_path.name)],
+                capture_output=True,
+                text=True
+            )
+
+            assert result.returncode == 0
+            assert result.stdout.split() == ["first", "unstamped", "third"]
+        finally:
+            os.unlink(test_script_path.name)
+
 
 class TestPTYSession:
     """Test proj2 in actual PTY sessions using ptytest."""